@@ -0,0 +1,268 @@
+"""SnapCam load/latency benchmark.
+
+Drives SnapCamCamera + TriggerEngine with synthetic state and event storms against
+stand-in camera entities, a local aiohttp image server and a scratch image file, on a
+bare Home Assistant core (no integrations loaded). Prints one JSON document.
+
+    python benchmarks/bench_snapcam.py [--entries 20] [--pairs 10] [--output bench.json]
+
+Requires the Home Assistant dev environment (homeassistant, aiohttp; Pillow optional).
+"""
+from __future__ import annotations
+import argparse, asyncio, gc, io, json, os, platform, random, sys, tempfile, time, tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aiohttp import web
+from homeassistant.components.camera import Image
+from homeassistant.core import HomeAssistant
+
+from custom_components.snapcam import camera as camera_mod
+from custom_components.snapcam.broker import async_get_broker
+from custom_components.snapcam.client import async_get_http_client
+from custom_components.snapcam.const import *
+from custom_components.snapcam.scheduler import SnapScheduler
+from custom_components.snapcam.store import SnapStore
+
+def make_frames(count: int, size: tuple[int, int]) -> list[bytes]:
+    """Distinct JPEGs so duplicate detection does not short-circuit the pipeline."""
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        return [camera_mod._PLACEHOLDER_JPEG + bytes([i % 256]) for i in range(count)]
+    frames = []
+    for i in range(count):
+        img = PILImage.effect_noise(size, 40 + i).convert("RGB")
+        buf = io.BytesIO(); img.save(buf, format="JPEG", quality=80)
+        frames.append(buf.getvalue())
+    return frames
+
+class FakeSources:
+    """Stand-in camera entities, HTTP endpoint and file, all rotating through `frames`."""
+
+    def __init__(self, hass: HomeAssistant, frames: list[bytes], latency_s: float) -> None:
+        self.hass, self.frames, self.latency_s = hass, frames, latency_s
+        self._i = 0
+        self.hits = {"entity": 0, "url": 0, "file": 0}
+        self.url = None
+        self.file_path = None
+        self._runner = None
+
+    def next_frame(self) -> bytes:
+        self._i += 1
+        return self.frames[self._i % len(self.frames)]
+
+    async def async_get_image(self, hass, entity_id, timeout=10, width=None, height=None):
+        self.hits["entity"] += 1
+        await asyncio.sleep(self.latency_s)
+        return Image("image/jpeg", self.next_frame())
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.hits["url"] += 1
+        await asyncio.sleep(self.latency_s)
+        return web.Response(body=self.next_frame(), content_type="image/jpeg")
+
+    async def async_start(self, tmpdir: str) -> None:
+        app = web.Application(); app.router.add_get("/snap.jpg", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/snap.jpg"
+        self.file_path = os.path.join(tmpdir, "latest.jpg")
+        Path(self.file_path).write_bytes(self.frames[0])
+
+    def rewrite_file(self) -> None:
+        tmp = self.file_path + ".tmp"
+        Path(tmp).write_bytes(self.next_frame()); os.replace(tmp, self.file_path)
+
+    async def async_stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+class Bench:
+    def __init__(self, hass: HomeAssistant, sources: FakeSources) -> None:
+        self.hass, self.sources = hass, sources
+        self.cams: list[camera_mod.SnapCamCamera] = []
+        self.state_writes = 0
+        self.write_s = 0.0
+
+    def add_entry(self, idx: int, pairs: list[dict], **options) -> camera_mod.SnapCamCamera:
+        entry_id = f"bench{idx}"
+        data = {CONF_CAM_NAME: f"Bench {idx}", CONF_DELAY_MIN: 0, CONF_PAIRS: pairs, **options}
+        entry = SimpleNamespace(entry_id=entry_id, data=data, options={})
+        store = SnapStore()
+        self.hass.data.setdefault(DATA_STORES, {})[entry_id] = store
+        async_get_http_client(self.hass).register(entry_id, data.get(CONF_URL_POOL_SIZE))
+        cam = camera_mod.SnapCamCamera(self.hass, entry, store)
+        cam.entity_id = f"camera.snapcam_bench_{idx}"
+        store.scheduler = SnapScheduler(self.hass, cam._do_snapshot, 0.0, entry_id)
+
+        def _write(cam=cam) -> None:  # state machine write incl. attribute build, without an entity platform
+            t0 = time.perf_counter()
+            self.hass.states.async_set(cam.entity_id, "idle", cam.extra_state_attributes)
+            self.write_s += time.perf_counter() - t0
+            self.state_writes += 1
+        cam.async_write_ha_state = _write
+        store.async_add_listener(_write)
+        cam._subscribe_triggers()
+        self.cams.append(cam)
+        return cam
+
+    async def async_teardown(self) -> None:
+        for cam in self.cams:
+            await cam.async_remove_listeners()
+            await async_get_http_client(self.hass).async_unregister(cam.entry.entry_id)
+        self.cams.clear()
+        self.hass.data.pop(DATA_STORES, None)
+
+def state_pair(kind: str, sources: FakeSources, sensor: str, n: int) -> dict:
+    pair = {KEY_PAIR_SOURCE_KIND: kind, KEY_TRIGGER_TYPE: TRIGGER_STATE, KEY_STATE_ENTITY: sensor, KEY_STATE_TO: "on"}
+    if kind == "entity": pair[KEY_PAIR_CAMERA] = f"camera.fake_{n}"
+    elif kind == "url": pair[KEY_PAIR_URL] = f"{sources.url}?n={n}"
+    else: pair[KEY_PAIR_FILE] = sources.file_path
+    return pair
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    vals = sorted(values)
+    pick = lambda q: vals[min(len(vals) - 1, int(q * len(vals)))]
+    return {"n": len(vals), "p50_ms": pick(0.50) * 1e3, "p90_ms": pick(0.90) * 1e3, "p99_ms": pick(0.99) * 1e3, "max_ms": vals[-1] * 1e3}
+
+async def bench_dispatch(hass: HomeAssistant, sources: FakeSources, args) -> dict:
+    """State + event storm throughput; cooldown blocks fetches so only dispatch is measured."""
+    bench = Bench(hass, sources)
+    sensors = [f"binary_sensor.bench_{i}" for i in range(args.sensors)]
+    for e in range(args.entries):
+        pairs = [state_pair("entity", sources, sensors[(e + p) % len(sensors)], p) for p in range(args.pairs)]
+        pairs.append({KEY_PAIR_SOURCE_KIND: "entity", KEY_PAIR_CAMERA: "camera.fake_evt", KEY_TRIGGER_TYPE: TRIGGER_EVENT,
+                      KEY_EVENT_TYPE: "bench_event", KEY_EVENT_DATA: {"zone": f"z{e % 4}"}})
+        cam = bench.add_entry(e, pairs)
+        cam.store.scheduler.cooldown_s = 3600.0
+        cam.store.scheduler._next_ok = time.monotonic() + 3600.0
+    await hass.async_block_till_done()
+
+    t0 = time.perf_counter()
+    for i in range(args.storm):
+        hass.states.async_set(sensors[i % len(sensors)], "on" if (i // len(sensors)) % 2 == 0 else "off")
+        if i % 256 == 0:
+            await hass.async_block_till_done()
+    await hass.async_block_till_done()
+    state_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(args.storm):
+        hass.bus.async_fire("bench_event", {"zone": f"z{i % 8}"})
+        if i % 256 == 0:
+            await hass.async_block_till_done()
+    await hass.async_block_till_done()
+    event_s = time.perf_counter() - t0
+
+    matches = sum(c.store.scheduler.skipped + c.store.scheduler.coalesced + c.store.scheduler.started for c in bench.cams)
+    await bench.async_teardown()
+    return {"entries": args.entries, "pairs_per_entry": args.pairs + 1, "state_changes": args.storm, "events": args.storm,
+            "state_changes_per_s": args.storm / state_s, "events_per_s": args.storm / event_s, "trigger_matches": matches}
+
+async def bench_latency(hass: HomeAssistant, sources: FakeSources, args, kind: str) -> dict:
+    """Trigger-to-image latency: sensor flip -> frame stored in SnapStore.current."""
+    bench = Bench(hass, sources)
+    sensor = f"binary_sensor.lat_{kind}"
+    cams = [bench.add_entry(100 + e, [state_pair(kind, sources, sensor, e)]) for e in range(args.latency_entries)]
+    async_get_broker(hass).window_s = 0.0  # measure the fetch, not the broker's reuse window
+    samples: list[float] = []
+    for _ in range(args.latency_samples):
+        hass.states.async_set(sensor, "off"); await hass.async_block_till_done()
+        if kind == "file":
+            await hass.async_add_executor_job(sources.rewrite_file)
+        gens = [c.store.generation for c in cams]
+        t0 = time.perf_counter()
+        hass.states.async_set(sensor, "on")
+        pending = set(range(len(cams)))
+        deadline = t0 + 5.0
+        while pending and time.perf_counter() < deadline:
+            await asyncio.sleep(0)
+            for i in list(pending):
+                if cams[i].store.generation != gens[i]:
+                    samples.append(time.perf_counter() - t0); pending.discard(i)
+        await hass.async_block_till_done()
+    async_get_broker(hass).window_s = BROKER_WINDOW_S
+    await bench.async_teardown()
+    return {"entries": len(cams), **percentiles(samples), "source_hits": dict(sources.hits)}
+
+async def bench_memory(hass: HomeAssistant, sources: FakeSources, args) -> dict:
+    """Heap per entry (after one snapshot each) and allocations per snapshot."""
+    bench = Bench(hass, sources)
+    gc.collect(); tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    cams = [bench.add_entry(200 + e, [state_pair("entity", sources, f"binary_sensor.mem_{e}", e) for _ in range(args.pairs)])
+            for e in range(args.entries)]
+    for cam in cams:
+        await cam.store.scheduler.async_request(cam._pairs[0])
+    await hass.async_block_till_done()
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    frame_bytes = sum(c.store.current.nbytes for c in cams if c.store.current)
+
+    cam = cams[0]
+    before = tracemalloc.take_snapshot()
+    for _ in range(args.alloc_samples):
+        await cam._do_snapshot(random.choice(cam._pairs))
+    after = tracemalloc.take_snapshot()
+    diff = after.compare_to(before, "filename")
+    allocs = sum(s.count_diff for s in diff if s.count_diff > 0)
+    alloc_bytes = sum(s.size_diff for s in diff if s.size_diff > 0)
+    tracemalloc.stop()
+    await bench.async_teardown()
+    return {"entries": len(cams), "bytes_per_entry": (used - base) / len(cams), "frame_bytes_per_entry": frame_bytes / len(cams),
+            "overhead_bytes_per_entry": (used - base - frame_bytes) / len(cams),
+            "net_allocs_per_snapshot": allocs / args.alloc_samples, "net_alloc_bytes_per_snapshot": alloc_bytes / args.alloc_samples}
+
+async def main(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        hass = HomeAssistant(tmpdir)
+        frames = make_frames(args.frames, (args.width, args.height))
+        sources = FakeSources(hass, frames, args.source_latency_ms / 1e3)
+        camera_mod.async_get_image = sources.async_get_image
+        await sources.async_start(tmpdir)
+        try:
+            results = {"dispatch": await bench_dispatch(hass, sources, args)}
+            for kind in ("entity", "file", "url"):
+                results[f"latency_{kind}"] = await bench_latency(hass, sources, args, kind)
+            results["memory"] = await bench_memory(hass, sources, args)
+        finally:
+            await sources.async_stop()
+            await async_get_http_client(hass).async_close()
+            await hass.async_stop(force=True)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "frame_bytes": sum(map(len, frames)) // len(frames),
+                 "args": vars(args), "ts": time.time()},
+        "results": results,
+    }
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--entries", type=int, default=20)
+    p.add_argument("--pairs", type=int, default=10)
+    p.add_argument("--sensors", type=int, default=50)
+    p.add_argument("--storm", type=int, default=10000, help="state changes / events per storm")
+    p.add_argument("--latency-entries", type=int, default=8)
+    p.add_argument("--latency-samples", type=int, default=50)
+    p.add_argument("--alloc-samples", type=int, default=50)
+    p.add_argument("--source-latency-ms", type=float, default=5.0)
+    p.add_argument("--frames", type=int, default=8)
+    p.add_argument("--width", type=int, default=1280)
+    p.add_argument("--height", type=int, default=720)
+    p.add_argument("--output", help="write JSON here instead of stdout")
+    return p.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = json.dumps(asyncio.run(main(args)), indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+    else:
+        print(report)
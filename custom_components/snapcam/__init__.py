@@ -4,7 +4,10 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
-from .const import DOMAIN, PLATFORMS, DATA_ENTITIES, DATA_STORES
+from .const import DOMAIN, PLATFORMS, DATA_ENTITIES, DATA_STORES, CONF_URL_POOL_SIZE, DEFAULT_URL_POOL_SIZE, CONF_FETCH_CONCURRENCY, DEFAULT_FETCH_CONCURRENCY
+from .client import async_get_http_client
+from .spill import async_get_spill
+from .limiter import async_get_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,6 +18,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug("SnapCam: setup entry %s", entry.entry_id)
     hass.data.setdefault(DATA_ENTITIES, {})
     hass.data.setdefault(DATA_STORES, {})
+    data = dict(entry.data); data.update(entry.options)
+    async_get_http_client(hass).register(entry.entry_id, data.get(CONF_URL_POOL_SIZE, DEFAULT_URL_POOL_SIZE))
+    async_get_limiter(hass).register(entry.entry_id, data.get(CONF_FETCH_CONCURRENCY, DEFAULT_FETCH_CONCURRENCY))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
     return True
@@ -32,5 +38,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 await ent.async_remove_listeners()
             except Exception:
                 pass
-        hass.data.get(DATA_STORES, {}).pop(entry.entry_id, None)
+        store = hass.data.get(DATA_STORES, {}).pop(entry.entry_id, None)
+        if store is not None:
+            store.release()
+        await async_get_http_client(hass).async_unregister(entry.entry_id)
+        async_get_limiter(hass).unregister(entry.entry_id)
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await async_get_spill(hass).async_forget(entry.entry_id)
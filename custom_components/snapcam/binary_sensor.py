@@ -20,6 +20,7 @@ class SnapCamTriggeredBinarySensor(BinarySensorEntity):
     _attr_name = "SnapCam Triggered"
     _attr_device_class = "motion"
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, store) -> None:
         self.hass, self.entry, self.store = hass, entry, store
@@ -38,6 +39,10 @@ class SnapCamTriggeredBinarySensor(BinarySensorEntity):
         ts = getattr(self.store, "last_update_ts", None)
         return {"last_triggered": ts.isoformat() if ts else None}
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.store.async_add_listener(self.pulse_triggered))
+
     def pulse_triggered(self) -> None:
         if self.store.trigger_pulse_off:
             try: self.store.trigger_pulse_off()
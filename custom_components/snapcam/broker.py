@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, Optional
+import asyncio, logging, time
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_BROKER, BROKER_WINDOW_S
+
+_LOGGER = logging.getLogger(__name__)
+
+class FetchBroker:
+    """Hass-wide fetch deduplication keyed by source (e.g. ("entity", "camera.door")).
+
+    Concurrent requests for the same source share one in-flight fetch; a result stays
+    reusable for `window_s` seconds so entries triggered by the same event get the
+    very same bytes object instead of hitting the source again. File sources are only
+    joined while in flight: the file may be rewritten at any moment, so their result
+    is never cached.
+    """
+
+    def __init__(self, hass: HomeAssistant, window_s: float = BROKER_WINDOW_S) -> None:
+        self.hass, self.window_s = hass, window_s
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._recent: dict[tuple, tuple[float, bytes]] = {}
+        self.fetches = 0
+        self.shared = 0
+
+    async def async_fetch(self, key: tuple, fetch: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        hit = self._recent.get(key)
+        if hit is not None:
+            if time.monotonic() - hit[0] <= self.window_s:
+                self.shared += 1
+                return hit[1]
+            self._recent.pop(key, None)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            _LOGGER.debug("SnapCam: joining in-flight fetch for %s", key)
+        else:
+            self.fetches += 1
+            task = self._inflight[key] = self.hass.async_create_task(self._run(key, fetch))
+        return await asyncio.shield(task)
+
+    async def _run(self, key: tuple, fetch: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        try:
+            content = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+        now = time.monotonic()
+        for k in [k for k, (ts, _) in self._recent.items() if now - ts > self.window_s]:
+            self._recent.pop(k, None)
+        if content is not None and self.window_s > 0 and key[0] != "file":
+            self._recent[key] = (now, content)
+        return content
+
+def async_get_broker(hass: HomeAssistant) -> FetchBroker:
+    broker = hass.data.get(DATA_BROKER)
+    if broker is None:
+        broker = hass.data[DATA_BROKER] = FetchBroker(hass)
+    return broker
@@ -1,26 +1,48 @@
 
 from __future__ import annotations
 from typing import Any, Callable, Optional, List
-from dataclasses import dataclass
-import random, base64, logging
+from dataclasses import dataclass, field
+import asyncio, math, random, base64, logging, time
 from pathlib import Path
 import voluptuous as vol
+from aiohttp import web
 from homeassistant.components.camera import Camera, async_get_image
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_state_change, async_track_state_change_event
 from homeassistant.helpers.entity_platform import AddEntitiesCallback, async_get_current_platform
 from homeassistant.util import dt as dt_util
+from homeassistant.util.read_only_dict import ReadOnlyDict
 from homeassistant.helpers import config_validation as cv
 
 from .const import *
+from .client import async_get_http_client
+from .broker import async_get_broker
+from .limiter import async_get_limiter
+from .files import FileSource
+from .image import change_score, compose_mosaic, sniff_content_type
+from .triggers import TriggerEngine
+from .prefetch import Prefetcher
+from .scheduler import SnapScheduler
+from .stream import mjpeg_part_header
+from .spill import async_get_spill
+from .startup import async_get_startup
+from .frame import Frame
+from .store import SnapStore, SnapHistory, async_get_history_budget, async_get_preroll_budget
 
 _LOGGER = logging.getLogger(__name__)
 ATTR_SOURCE_CAMERA = "source_camera"
+ATTR_INDEX = "index"
+ATTR_SOURCES = "sources"
 
 _PLACEHOLDER_JPEG = base64.b64decode(
     b"/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAP//////////////////////////////////////////////////////////////////////////////////////2wBDAf//////////////////////////////////////////////////////////////////////////////////////wAARCAAQABADASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAb/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQEBAQAAAAAAAAAAAAAAAAAAAgP/xAAUEQEAAAAAAAAAAAAAAAAAAAAA/9oADAMBAAIRAxEAPwD3gA//2Q=="
 )
+_PLACEHOLDER = Frame(_PLACEHOLDER_JPEG)
+# counters and per-commit lists change on every write; only last_update/last_source_camera are recorded
+_VOLATILE_ATTRS = frozenset({
+    "triggers_coalesced", "triggers_skipped", "triggers_suppressed", "prefetch_hits", "duplicate_frames",
+    "duplicate_rate", "unchanged_frames", "burst", "burst_ts", "history", "history_index",
+})
 
 @dataclass
 class Pair:
@@ -28,20 +50,25 @@ class Pair:
     camera: Optional[str] = None   # entity_id when source_kind=entity
     file_path: Optional[str] = None
     url: Optional[str] = None
+    timeout: Optional[float] = None  # url fetch timeout (s)
     trigger_type: str = TRIGGER_STATE
     state_entity: Optional[str] = None
     state_to: Optional[str] = None
     state_from: Optional[str] = None
+    attribute: Optional[str] = None
+    above: Optional[float] = None
+    below: Optional[float] = None
+    condition: Optional[str] = None  # template, compiled once by the TriggerEngine
     event_type: Optional[str] = None
     event_data: Optional[dict] = None
-
-class SnapStore:
-    def __init__(self) -> None:
-        self.current: Optional[bytes] = None
-        self.last: Optional[bytes] = None
-        self.last_update_ts = None  # tz-aware datetime
-        self.last_source_camera: Optional[str] = None
-        self.trigger_pulse_off = None
+    hold_s: float = 0.0       # state must stay matched this long
+    debounce_s: float = 0.0   # swallow re-matches until quiet this long
+    cooldown_s: float = 0.0   # per-pair minimum gap between firings
+    prefetch_s: float = 0.0   # warm-frame polling interval, 0 = off
+    prefetch_while: Optional[str] = None
+    preroll_s: float = 0.0    # pre-trigger lookback, 0 = off
+    preroll_pick: str = "earliest"
+    file_source: Optional[FileSource] = field(default=None, repr=False, compare=False)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     data = dict(entry.data); data.update(entry.options)
@@ -49,13 +76,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 
     store = hass.data.setdefault(DATA_STORES, {}).get(entry.entry_id)
     if store is None:
-        store = SnapStore()
+        depth = int(data.get(CONF_HISTORY_DEPTH, DEFAULT_HISTORY_DEPTH))
+        history = None
+        if depth > 0:
+            max_bytes = int(float(data.get(CONF_HISTORY_MAX_MB, DEFAULT_HISTORY_MAX_MB)) * 1024 * 1024)
+            history = SnapHistory(depth, max_bytes, async_get_history_budget(hass))
+        store = SnapStore(history)
         hass.data[DATA_STORES][entry.entry_id] = store
+        if data.get(CONF_PERSIST):
+            store.restored = await async_get_spill(hass).async_restore(entry.entry_id, store)
 
-    main = SnapCamCamera(hass, entry, store, role="current")
+    cls = SnapCamCamera if data.get(CONF_RECORD_PAIRS, DEFAULT_RECORD_PAIRS) else SnapCamCameraUnrecordedPairs
+    main = cls(hass, entry, store, role="current")
+    store.scheduler = SnapScheduler(hass, main._do_snapshot, main._cooldown_min * 60.0, entry.entry_id, key=main._job_key)
     entities = [main]
     if create_last:
-        entities.append(SnapCamCamera(hass, entry, store, role="last"))
+        entities.append(cls(hass, entry, store, role="last"))
+    if store.history is not None:
+        entities.append(cls(hass, entry, store, role="history"))
     async_add_entities(entities)
     hass.data[DATA_ENTITIES][entry.entry_id] = entities
 
@@ -65,11 +103,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         cv.make_entity_service_schema({vol.Optional(ATTR_SOURCE_CAMERA): cv.entity_id}),
         "async_request_snapshot",
     )
+    platform.async_register_entity_service(
+        "show_history_frame",
+        cv.make_entity_service_schema({vol.Required(ATTR_INDEX): vol.All(vol.Coerce(int), vol.Range(min=0))}),
+        "async_show_history_frame",
+    )
+    platform.async_register_entity_service(
+        "burst_snapshot",
+        cv.make_entity_service_schema({vol.Optional(ATTR_SOURCES): vol.All(cv.ensure_list, [cv.string])}),
+        "async_burst_snapshot",
+    )
 
 class SnapCamCamera(Camera):
     _attr_has_entity_name = False
     _attr_name = None
-    _attr_content_type = "image/jpeg"
+    _unrecorded_attributes = _VOLATILE_ATTRS
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, store: 'SnapStore', role: str="current") -> None:
         super().__init__()
@@ -79,6 +127,20 @@ class SnapCamCamera(Camera):
         self._cam_name = data.get(CONF_CAM_NAME, "SnapCam")
         self._cam_description = data.get(CONF_CAM_DESCRIPTION, "")
         self._cooldown_min = float(data.get(CONF_DELAY_MIN, DEFAULT_DELAY_MIN))  # cooldown semantics
+        self._url_timeout = float(data.get(CONF_URL_TIMEOUT) or DEFAULT_URL_TIMEOUT)
+        self._url_max_bytes = int(float(data.get(CONF_URL_MAX_MB) or DEFAULT_URL_MAX_MB) * 1024 * 1024)
+        self._resize_quality = int(data.get(CONF_RESIZE_QUALITY, DEFAULT_RESIZE_QUALITY))
+        fmt = data.get(CONF_OUTPUT_FORMAT, DEFAULT_OUTPUT_FORMAT)
+        self._output_type = None if fmt == "original" else f"image/{fmt}"
+        self._drop_duplicates = bool(data.get(CONF_DROP_DUPLICATES, DEFAULT_DROP_DUPLICATES))
+        self._change_threshold = float(data.get(CONF_CHANGE_THRESHOLD, DEFAULT_CHANGE_THRESHOLD))
+        self._stream_keepalive = float(data.get(CONF_STREAM_KEEPALIVE, DEFAULT_STREAM_KEEPALIVE))
+        self._burst_mode = bool(data.get(CONF_BURST_MODE, False))
+        self._burst_parallel = max(1, int(data.get(CONF_BURST_PARALLEL, DEFAULT_BURST_PARALLEL)))
+        self._burst_deadline = float(data.get(CONF_BURST_DEADLINE, DEFAULT_BURST_DEADLINE))
+        self._burst_mosaic = bool(data.get(CONF_BURST_MOSAIC, False))
+        self._persist = bool(data.get(CONF_PERSIST, False))
+        self._source_rate = float(data.get(CONF_SOURCE_RATE, DEFAULT_SOURCE_RATE))
         self._pairs: List[Pair] = []
         for p in data.get(CONF_PAIRS, []) or []:
             kind = p.get(KEY_PAIR_SOURCE_KIND) or ("entity" if p.get(KEY_PAIR_CAMERA) else ("file" if p.get(KEY_PAIR_FILE) else ("url" if p.get(KEY_PAIR_URL) else "entity")))
@@ -88,17 +150,39 @@ class SnapCamCamera(Camera):
                 camera=p.get(KEY_PAIR_CAMERA),
                 file_path=self._normalize_path(p.get(KEY_PAIR_FILE)) if p.get(KEY_PAIR_FILE) else None,
                 url=p.get(KEY_PAIR_URL),
+                timeout=float(p[KEY_PAIR_TIMEOUT]) if p.get(KEY_PAIR_TIMEOUT) else None,
                 trigger_type=ttype,
                 state_entity=p.get(KEY_STATE_ENTITY),
-                state_to=p.get(KEY_STATE_TO) or DEFAULT_TO_STATE,
+                state_to=p.get(KEY_STATE_TO) or (None if p.get(KEY_STATE_ATTRIBUTE) else DEFAULT_TO_STATE),
                 state_from=p.get(KEY_STATE_FROM),
+                attribute=p.get(KEY_STATE_ATTRIBUTE) or None,
+                above=float(p[KEY_STATE_ABOVE]) if p.get(KEY_STATE_ABOVE) not in (None, "") else None,
+                below=float(p[KEY_STATE_BELOW]) if p.get(KEY_STATE_BELOW) not in (None, "") else None,
+                condition=p.get(KEY_CONDITION) or None,
                 event_type=p.get(KEY_EVENT_TYPE),
                 event_data=p.get(KEY_EVENT_DATA),
+                hold_s=float(p.get(KEY_PAIR_FOR) or 0),
+                debounce_s=float(p.get(KEY_PAIR_DEBOUNCE) or 0),
+                cooldown_s=float(p.get(KEY_PAIR_COOLDOWN) or 0),
+                prefetch_s=float(p.get(KEY_PAIR_PREFETCH) or 0),
+                prefetch_while=p.get(KEY_PAIR_PREFETCH_WHILE) or None,
+                preroll_s=float(p.get(KEY_PAIR_PREROLL) or 0),
+                preroll_pick=p.get(KEY_PAIR_PREROLL_PICK) or "earliest",
             )
+            if pair.file_path:
+                pair.file_source = FileSource(pair.file_path)
             self._pairs.append(pair)
 
+        self._static_attrs = ReadOnlyDict({  # built once; every state write shares these objects
+            "description": self._cam_description, "cooldown_min": self._cooldown_min,
+            "pairs": tuple(ReadOnlyDict(self._pair_to_attr(p)) for p in self._pairs), "role": role,
+        })
+
         self._unsubscribers: List[Callable[[], None]] = []
-        suffix = "" if self.role == "current" else "_last"
+        self._engine: Optional[TriggerEngine] = None
+        self._warm: dict[tuple, Prefetcher] = {}  # source key -> warm-frame prefetcher
+        self._history_index = 0  # frame shown by the history camera, 0 = newest
+        suffix = "" if self.role == "current" else f"_{self.role}"
         self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}{suffix}"
         self._attr_motion_detection_enabled = False
         self._attr_should_poll = False
@@ -116,7 +200,7 @@ class SnapCamCamera(Camera):
 
     @property
     def name(self) -> str:
-        return self._cam_name if self.role == "current" else f"{self._cam_name}_last"
+        return self._cam_name if self.role == "current" else f"{self._cam_name}_{self.role}"
 
     @property
     def device_info(self) -> dict[str, Any]:
@@ -125,171 +209,329 @@ class SnapCamCamera(Camera):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         ts = getattr(self.store, "last_update_ts", None)
-        return {
-            "description": self._cam_description, "cooldown_min": self._cooldown_min,
-            "pairs": [self._pair_to_attr(p) for p in self._pairs],
-            "last_update": ts.isoformat() if ts else None,
-            "last_source_camera": self.store.last_source_camera, "role": self.role,
-        }
+        attrs = {**self._static_attrs, "last_update": ts.isoformat() if ts else None, "last_source_camera": self.store.last_source_camera}
+        if self.role == "current" and self.store.scheduler is not None:
+            attrs["triggers_coalesced"] = self.store.scheduler.coalesced
+            attrs["triggers_skipped"] = self.store.scheduler.skipped
+            if self._engine is not None:
+                attrs["triggers_suppressed"] = self._engine.suppressed
+            if self._warm:
+                attrs["prefetch_hits"] = sum(w.hits for w in self._warm.values())
+            attrs["duplicate_frames"] = self.store.duplicates
+            attrs["duplicate_rate"] = round(self.store.duplicates / self.store.frames_seen, 3) if self.store.frames_seen else 0.0
+            if self._change_threshold > 0:
+                attrs["unchanged_frames"] = self.store.unchanged
+            if self.store.burst:
+                attrs["burst"] = [{"source": f.source, "bytes": f.nbytes} for f in self.store.burst]
+                attrs["burst_ts"] = self.store.burst[0].ts.isoformat()
+        if self.role == "history" and self.store.history is not None:
+            attrs["history_index"] = self._history_index
+            attrs["history"] = [
+                {"index": k, "source": f.source, "ts": f.ts.isoformat(), "bytes": f.nbytes}
+                for k, f in enumerate(reversed(self.store.history.slots))
+            ]
+        return attrs
 
     def _pair_to_attr(self, p: Pair) -> dict:
         d = {"source_kind": p.source_kind, "camera": p.camera, "file_path": p.file_path, "url": p.url, "trigger_type": p.trigger_type}
         if p.trigger_type == TRIGGER_STATE:
             d.update({"entity_id": p.state_entity, "to": p.state_to, "from": p.state_from})
-        else:
+        elif p.trigger_type == TRIGGER_EVENT:
             d.update({"event_type": p.event_type, "event_data": p.event_data})
+        for k, v in (("attribute", p.attribute), ("above", p.above), ("below", p.below), ("condition", p.condition),
+                     ("for", p.hold_s), ("debounce", p.debounce_s), ("pair_cooldown", p.cooldown_s),
+                     ("prefetch", p.prefetch_s), ("prefetch_while", p.prefetch_while), ("preroll", p.preroll_s)):
+            if v is not None and (v or k in ("above", "below")):
+                d[k] = v
         return d
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         if self.role == "current":
             self._subscribe_triggers()
+            self._start_prefetch()
         self._attr_entity_picture = f"/api/camera_proxy/{self.entity_id}"
+        self.async_on_remove(self.store.async_add_listener(self.async_write_ha_state))
         self.async_write_ha_state()
-        await self._initial_snapshot()
+        if self.role == "current":
+            async_get_startup(self.hass).async_enqueue(self.entry.entry_id, self._initial_snapshot)
 
     async def async_will_remove_from_hass(self) -> None:
         await super().async_will_remove_from_hass()
         await self.async_remove_listeners()
 
     async def async_remove_listeners(self) -> None:
+        if self.role == "current":
+            async_get_startup(self.hass).async_cancel(self.entry.entry_id)
         for unsub in self._unsubscribers:
             try: unsub()
             except Exception: pass
         self._unsubscribers.clear()
+        self._warm.clear()
+
+    def _start_prefetch(self) -> None:
+        for pair in self._pairs:
+            key = self._source_key(pair)
+            if (pair.prefetch_s > 0 or pair.preroll_s > 0) and key not in self._warm:
+                interval = pair.prefetch_s or PREROLL_INTERVAL_S
+                ring = wanted = None
+                if pair.preroll_s > 0:
+                    depth = min(PREROLL_MAX_FRAMES, math.ceil(pair.preroll_s / interval) + 1)
+                    ring = SnapHistory(depth, PREROLL_MAX_MB * 1024 * 1024, async_get_preroll_budget(self.hass))
+                    wanted = None if pair.prefetch_while else self.store.frames.watching  # armed entity or a viewer
+                warm = self._warm[key] = Prefetcher(self.hass, lambda p=pair: self._load_bytes(p), interval, pair.prefetch_while,
+                                                    self.entry.entry_id, ring, wanted, self._select_label(pair))
+                warm.start()
+                self._unsubscribers.append(warm.stop)
 
     def _subscribe_triggers(self) -> None:
-        for u in self._unsubscribers:
-            try: u()
-            except Exception: pass
-        self._unsubscribers.clear()
-
+        if self._engine is not None:
+            self._engine.unsubscribe()
         if not self._pairs:
             _LOGGER.debug("SnapCam[%s]: no pairs -> no subscriptions", self.entry.entry_id); return
-
-        state_entities = [p.state_entity for p in self._pairs if p.trigger_type == TRIGGER_STATE and p.state_entity]
-        if state_entities:
-            async def _state_cb(entity, old, new):
-                old_val = (old.state.lower() if old else None)
-                new_val = (new.state.lower() if new else None)
-                _LOGGER.debug("SnapCam[%s]: state_cb %s %s -> %s", self.entry.entry_id, entity, old_val, new_val)
-                if new_val == old_val:
-                    return
-                for pair in [pp for pp in self._pairs if pp.trigger_type == TRIGGER_STATE and pp.state_entity == entity]:
-                    ok_from = (pair.state_from is None) or (old_val == (pair.state_from or "").lower())
-                    to_target = (pair.state_to or DEFAULT_TO_STATE).lower()
-                    ok_to = (new_val == to_target)
-                    if ok_from and ok_to:
-                        _LOGGER.debug("SnapCam[%s]: MATCH %s from=%s to=%s -> immediate snapshot (cooldown)", self.entry.entry_id, entity, old_val, new_val)
-                        self._trigger_snapshot_immediate(pair)
-            unsub = async_track_state_change(self.hass, state_entities, _state_cb)
-            self._unsubscribers.append(unsub)
-            _LOGGER.debug("SnapCam[%s]: subscribed state %s", self.entry.entry_id, state_entities)
-
-            def _event_cb(event):
-                entity = event.data.get("entity_id")
-                old = event.data.get("old_state")
-                new = event.data.get("new_state")
-                old_val = (getattr(old, "state", None) or "").lower() if old else None
-                new_val = (getattr(new, "state", None) or "").lower() if new else None
-                _LOGGER.debug("SnapCam[%s]: state_event %s %s -> %s", self.entry.entry_id, entity, old_val, new_val)
-                if entity in state_entities and new_val != old_val:
-                    for pair in [pp for pp in self._pairs if pp.trigger_type == TRIGGER_STATE and pp.state_entity == entity]:
-                        ok_from = (pair.state_from is None) or (old_val == (pair.state_from or "").lower())
-                        to_target = (pair.state_to or DEFAULT_TO_STATE).lower()
-                        ok_to = (new_val == to_target)
-                        if ok_from and ok_to:
-                            _LOGGER.debug("SnapCam[%s]: MATCH(event) %s -> immediate snapshot (cooldown)", self.entry.entry_id, entity)
-                            self._trigger_snapshot_immediate(pair)
-            from homeassistant.helpers.event import async_track_state_change_event
-            unsub2 = async_track_state_change_event(self.hass, state_entities, _event_cb)
-            self._unsubscribers.append(unsub2)
-            _LOGGER.debug("SnapCam[%s]: subscribed state-event %s", self.entry.entry_id, state_entities)
-
-        for p in self._pairs:
-            if p.trigger_type == TRIGGER_EVENT and p.event_type:
-                def make_handler(pair: Pair):
-                    def _h(event):
-                        if pair.event_data:
-                            for k, v in pair.event_data.items():
-                                if event.data.get(k) != v: return
-                        _LOGGER.debug("SnapCam[%s]: event '%s' matched -> immediate snapshot (cooldown)", self.entry.entry_id, pair.event_type)
-                        self._trigger_snapshot_immediate(pair)
-                    return _h
-                unsub = self.hass.bus.async_listen(p.event_type, make_handler(p))
-                self._unsubscribers.append(unsub)
-                _LOGGER.debug("SnapCam[%s]: subscribed event %s filter=%s", self.entry.entry_id, p.event_type, p.event_data)
+        self._engine = TriggerEngine(self.hass, self._pairs, self._trigger_snapshot_immediate, self.entry.entry_id)
+        self._engine.subscribe()
+        self._unsubscribers.append(self._engine.unsubscribe)
 
     async def _initial_snapshot(self) -> None:
-        if not self._pairs: return
+        if not self._pairs or self.store.restored: return
         first = random.choice(self._pairs)
-        await self._do_snapshot(first)
+        await self.store.scheduler.async_request(first)
         has_last = any(getattr(e, "role", "") == "last" for e in self.hass.data.get(DATA_ENTITIES, {}).get(self.entry.entry_id, []))
         if has_last:
-            second = random.choice(self._pairs); await self._do_snapshot(second)
+            second = random.choice(self._pairs); await self.store.scheduler.async_request(second)
 
     def _select_label(self, pair: Pair) -> str:
         return pair.camera or pair.file_path or pair.url or "unknown"
 
-    def _cooldown_ok(self) -> bool:
-        if self.store.last_update_ts is None:
-            return True
-        delta = (dt_util.now() - self.store.last_update_ts).total_seconds() / 60.0
-        return delta >= float(self._cooldown_min)
-
     def _trigger_snapshot_immediate(self, pair: Pair) -> None:
-        if self._cooldown_ok():
-            self.hass.loop.call_soon_threadsafe(lambda: self.hass.async_create_task(self._do_snapshot(pair)))
-        else:
-            remain = (float(self._cooldown_min) * 60.0) - (dt_util.now() - (self.store.last_update_ts or dt_util.now())).total_seconds()
-            _LOGGER.debug("SnapCam[%s]: cooldown active (%.1fs remaining) -> skip", self.entry.entry_id, max(0.0, remain))
+        self.store.metrics.match(self._select_label(pair), pair.source_kind)
+        self.store.scheduler.async_trigger(pair)
+
+    def _source_key(self, pair: Pair) -> tuple:
+        return (pair.source_kind, pair.camera or pair.file_path or pair.url)
+
+    def _job_key(self, job: Pair | tuple[Pair, ...]) -> tuple:
+        """Scheduler key: jobs with equal keys may share one in-flight snapshot."""
+        if isinstance(job, tuple) or (self._burst_mode and len(self._pairs) > 1):
+            return ("burst",)
+        return self._source_key(job)
 
     async def _load_bytes(self, pair: Pair) -> Optional[bytes]:
+        key = self._source_key(pair)
+        return await async_get_broker(self.hass).async_fetch(key, lambda: self._limited_fetch(key, pair))
+
+    async def _limited_fetch(self, key: tuple, pair: Pair) -> Optional[bytes]:
+        async with async_get_limiter(self.hass).slot(key, self._source_rate):
+            return await self._fetch_source(pair)
+
+    async def _fetch_source(self, pair: Pair) -> Optional[bytes]:
         if pair.source_kind == "entity" and pair.camera:
             img = await async_get_image(self.hass, pair.camera)
             return img.content if img else None
-        if pair.source_kind == "file" and pair.file_path:
-            path = Path(pair.file_path)
-            def _io():
-                if path.exists() and path.is_file():
-                    return path.read_bytes()
-                return None
-            return await self.hass.async_add_executor_job(_io)
+        if pair.source_kind == "file" and pair.file_source is not None:
+            return await self.hass.async_add_executor_job(pair.file_source.read)
         if pair.source_kind == "url" and pair.url:
             try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(pair.url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                        if resp.status == 200:
-                            return await resp.read()
+                return await async_get_http_client(self.hass).async_fetch(self.entry.entry_id, pair.url, pair.timeout or self._url_timeout, self._url_max_bytes)
             except Exception as err:
                 _LOGGER.warning("SnapCam[%s]: URL fetch failed: %s", self.entry.entry_id, err)
             return None
         return None
 
-    async def _do_snapshot(self, pair: Pair) -> None:
+    async def _do_snapshot(self, job: Pair | tuple[Pair, ...]) -> bool:
+        """Scheduler job: one pair, or a tuple of pairs for a burst."""
+        if isinstance(job, tuple):
+            return await self._do_burst(job)
+        if self._burst_mode and len(self._pairs) > 1:
+            return await self._do_burst(tuple(self._pairs), primary=job)
+        label = self._select_label(job)
+        warm = self._warm.get(self._source_key(job))
+        if warm is not None and job.preroll_s > 0:
+            frame = warm.pick(job.preroll_s, job.preroll_pick)
+            if frame is not None:  # the moment before the trigger is the point: no live replacement
+                return await self._commit(frame, label)
+        frame = warm.take() if warm is not None else None
+        if frame is not None:  # show the warm frame now, replace it with a live one right after
+            gen = self.store.generation
+            ok = await self._commit(frame, label)
+            if ok and self.store.generation != gen:  # stored, not dropped as a duplicate of current
+                self.hass.async_create_task(self._refresh_warm(job, warm, label, self.store.generation))
+                return ok
+        content = await self._fetch_timed(job, label)
+        if content is not None and warm is not None:
+            warm.put(content)
+        return content is not None and await self._commit(content, label)
+
+    async def _refresh_warm(self, pair: Pair, warm: Prefetcher, label: str, gen: int) -> None:
+        """Live replacement for a warm frame; skipped if a newer frame landed meanwhile."""
+        content = await self._fetch_timed(pair, label)
+        if content is not None:
+            warm.put(content)
+            if self.store.generation == gen:
+                await self._commit(content, label, replace=True)
+
+    async def _fetch_timed(self, pair: Pair, label: str) -> Optional[bytes]:
+        t0 = time.perf_counter()
         try:
             content = await self._load_bytes(pair)
+        except Exception as err:
+            self.store.metrics.fetch(label, pair.source_kind, (time.perf_counter() - t0) * 1000.0, None)
+            _LOGGER.warning("SnapCam[%s]: snapshot failed: %s", self.entry.entry_id, err)
+            return None
+        self.store.metrics.fetch(label, pair.source_kind, (time.perf_counter() - t0) * 1000.0, None if content is None else len(content))
+        if content is None:
+            _LOGGER.warning("SnapCam[%s]: snapshot returned empty from %s", self.entry.entry_id, label)
+        return content
+
+    async def _do_burst(self, pairs: tuple[Pair, ...], primary: Pair | None = None) -> bool:
+        """Fetch every distinct source of `pairs` concurrently (bounded, shared deadline)."""
+        unique: dict[tuple, Pair] = {}
+        for p in pairs:
+            unique.setdefault(self._source_key(p), p)
+        sem = asyncio.Semaphore(self._burst_parallel)
+
+        async def _one(p: Pair) -> Optional[bytes]:
+            async with sem:
+                return await self._fetch_timed(p, self._select_label(p))
+        tasks = {self.hass.async_create_task(_one(p)): p for p in unique.values()}
+        done, pending = await asyncio.wait(tasks, timeout=self._burst_deadline)
+        for t in pending:
+            t.cancel()
+        frames = [(tasks[t], t.result()) for t in tasks if t in done and t.exception() is None and t.result() is not None]
+        if pending:
+            _LOGGER.debug("SnapCam[%s]: burst deadline hit, %d/%d sources late", self.entry.entry_id, len(pending), len(tasks))
+        if not frames:
+            return False
+        ts = dt_util.now()
+        self.store.burst = [Frame(c, self._select_label(p), ts) for p, c in frames]
+        if self._burst_mosaic and len(frames) > 1:
+            try:
+                mosaic = await self.hass.async_add_executor_job(compose_mosaic, [c for _, c in frames], self._resize_quality)
+            except Exception as err:
+                _LOGGER.debug("SnapCam[%s]: mosaic failed: %s", self.entry.entry_id, err)
+                mosaic = None
+            if mosaic:
+                return await self._commit(mosaic, f"mosaic ({len(frames)})")
+        want = self._source_key(primary) if primary is not None else None
+        pair, content = next(((p, c) for p, c in frames if self._source_key(p) == want), frames[0])
+        return await self._commit(content, self._select_label(pair))
+
+    async def _commit(self, content: bytes | Frame, label: str, replace: bool = False) -> bool:
+        """Dedup / change gate, then rotate into the store and write state.
+
+        A Frame (warm or pre-roll sample) is stored as is, keeping its capture time.
+        replace=True swaps the current frame without rotating it into `last`.
+        """
+        try:
             prev = self.store.current
-            if content is not None:
+            frame = content if isinstance(content, Frame) else Frame(content, label, dt_util.now())  # tz-aware datetime
+            content = frame.data
+            self.store.frames_seen += 1
+            if prev is not None and (content is prev.data or frame.digest == prev.digest):
+                self.store.duplicates += 1
+                if self._drop_duplicates:
+                    _LOGGER.debug("SnapCam[%s]: identical frame from %s -> dropped", self.entry.entry_id, label)
+                    return True
+            if self._change_threshold > 0:
+                try:
+                    thumb, score = await self.hass.async_add_executor_job(change_score, content, self.store.current_thumb)
+                except Exception as err:  # undecodable frame: let it through
+                    _LOGGER.debug("SnapCam[%s]: change gate skipped: %s", self.entry.entry_id, err)
+                    thumb, score = None, None
+                if score is not None and score < self._change_threshold:
+                    self.store.unchanged += 1
+                    _LOGGER.debug("SnapCam[%s]: scene change %.2f%% < %.2f%% -> dropped", self.entry.entry_id, score, self._change_threshold)
+                    return True
+                self.store.current_thumb = thumb
+            if not replace:
                 self.store.last = prev
-                self.store.current = content
-                self.store.last_update_ts = dt_util.now()  # tz-aware datetime
-                self.store.last_source_camera = self._select_label(pair)
-                self._attr_entity_picture = f"/api/camera_proxy/{self.entity_id}"
-                self.async_write_ha_state()
-                _LOGGER.debug("SnapCam[%s]: snapshot OK from %s (%d bytes)", self.entry.entry_id, self.store.last_source_camera, len(content))
-            else:
-                _LOGGER.warning("SnapCam[%s]: snapshot returned empty from %s", self.entry.entry_id, self._select_label(pair))
+            self.store.current = frame
+            self.store.generation += 1
+            self.store.resized.clear()
+            self.store.last_update_ts = frame.ts
+            self.store.last_source_camera = label
+            if self.store.history is not None:
+                if replace and self.store.history.slots and self.store.history.slots[-1] is prev:
+                    self.store.history.replace_newest(frame)  # the warm frame's slot
+                else:
+                    self.store.history.append(frame)
+            self._attr_entity_picture = f"/api/camera_proxy/{self.entity_id}"
+            t_write = time.perf_counter()
+            self.store.async_notify()  # every entity of the entry, same loop tick
+            self.store.metrics.state_write.record((time.perf_counter() - t_write) * 1000.0)
+            if self._persist:
+                async_get_spill(self.hass).async_schedule(self.entry.entry_id, self.store)
+            _LOGGER.debug("SnapCam[%s]: snapshot OK from %s (%d bytes)", self.entry.entry_id, self.store.last_source_camera, len(content))
+            return True
         except Exception as err:
             _LOGGER.warning("SnapCam[%s]: snapshot failed: %s", self.entry.entry_id, err)
+        return False
+
+    def _frame(self) -> Frame | None:
+        if self.role == "current":
+            return self.store.current
+        if self.role == "history":
+            frame = self.store.history.get(self._history_index) if self.store.history is not None else None
+            return frame or _PLACEHOLDER
+        return (self.store.last or self.store.current) or _PLACEHOLDER
 
     async def async_camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
-        return self.store.current if self.role == "current" else (self.store.last or self.store.current) or _PLACEHOLDER_JPEG
+        self.store.frames.touch()
+        if self.store.current is None:
+            async_get_startup(self.hass).async_promote(self.entry.entry_id)
+        frame = self._frame()
+        if frame is None:
+            return None
+        out_type = self._output_type if self._output_type != frame.content_type else None
+        if frame is _PLACEHOLDER or not (width or height or out_type):
+            self.content_type = frame.content_type  # read by HA right after this returns
+            return frame.data
+        key = (self.store.generation, self.role, self._history_index, width, height, self._resize_quality, out_type)
+        content = await self.store.resized.async_get(self.hass, key, frame.data, width, height, self._resize_quality, out_type)
+        self.content_type = frame.content_type if content is frame.data else sniff_content_type(content)
+        return content
+
+    async def handle_async_mjpeg_stream(self, request: web.Request) -> web.StreamResponse:
+        """Push the frame to the viewer whenever a snapshot is stored (no polling).
+
+        All viewers share the stored bytes object; only the small part header is per write.
+        """
+        response = web.StreamResponse()
+        response.content_type = "multipart/x-mixed-replace;boundary=--frameboundary"
+        await response.prepare(request)
+        signal = self.store.frames
+        signal.viewers += 1
+        try:
+            while True:
+                seen = signal.generation
+                frame = self._frame()
+                if frame is not None:
+                    await response.write(mjpeg_part_header(frame.content_type, frame.nbytes))
+                    await response.write(frame.data)
+                    await response.write(b"\r\n")
+                await signal.async_wait(self._stream_keepalive or None, seen)
+        except (ConnectionResetError, RuntimeError):
+            pass  # viewer went away
+        finally:
+            signal.viewers -= 1
+        return response
 
     async def async_update_from_entry(self) -> None:
         pass
 
+    async def async_show_history_frame(self, index: int = 0) -> None:
+        if self.role != "history":
+            _LOGGER.warning("SnapCam[%s]: show_history_frame only applies to the _history camera", self.entry.entry_id); return
+        self._history_index = int(index)
+        self.async_write_ha_state()
+
+    async def async_burst_snapshot(self, sources: list[str] | None = None) -> None:
+        pairs = tuple(p for p in self._pairs if not sources or self._select_label(p) in sources)
+        if not pairs:
+            _LOGGER.warning("SnapCam[%s]: burst_snapshot: no pair matches %s", self.entry.entry_id, sources); return
+        await self.store.scheduler.async_request(pairs)
+
     async def async_request_snapshot(self, source_camera: str | None = None) -> None:
         pair = None
         if source_camera:
@@ -299,4 +541,8 @@ class SnapCamCamera(Camera):
         if pair is None and self._pairs:
             pair = random.choice(self._pairs)
         if pair:
-            await self._do_snapshot(pair)
+            await self.store.scheduler.async_request(pair)
+
+class SnapCamCameraUnrecordedPairs(SnapCamCamera):
+    """SnapCamCamera whose static `pairs` attribute is kept out of the recorder (record_pairs off)."""
+    _unrecorded_attributes = _VOLATILE_ATTRS | {"pairs"}
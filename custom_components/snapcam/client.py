@@ -0,0 +1,198 @@
+from __future__ import annotations
+from typing import Optional
+from dataclasses import dataclass
+import logging, re
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_HTTP, DEFAULT_URL_POOL_SIZE, DEFAULT_URL_TIMEOUT, DEFAULT_URL_MAX_MB
+
+_LOGGER = logging.getLogger(__name__)
+_RETIRE_SECONDS = 30.0  # grace period before a replaced session is closed
+_SOI, _EOI = b"\xff\xd8", b"\xff\xd9"
+_PART_LENGTH = re.compile(rb"(?i)content-length:\s*(\d+)")
+
+class FrameTooLarge(Exception):
+    """Body exceeds the configured maximum frame size."""
+
+_STANDALONE = frozenset((0x01, *range(0xD0, 0xD8)))  # TEM, RSTn: markers without a length
+
+def _skip_segments(buf: bytearray, pos: int) -> tuple[int, bool]:
+    """Walk JPEG marker segments (APPn incl. EXIF thumbnails, DQT, SOFn, ...) from pos by
+    their lengths; returns (position, True) once the scan data after SOS is reached."""
+    while pos + 4 <= len(buf):
+        if buf[pos] != 0xFF:
+            return pos, True  # not a marker: treat as scan data
+        marker = buf[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+        elif marker in _STANDALONE:
+            pos += 2
+        elif marker == 0xD9:
+            return pos, True
+        else:
+            seglen = (buf[pos + 2] << 8) | buf[pos + 3]
+            pos += 2 + seglen
+            if marker == 0xDA:
+                return pos, True
+    return pos, False
+
+async def _read_body(resp: aiohttp.ClientResponse, max_bytes: int) -> Optional[bytes]:
+    """Bounded read: Content-Length is checked up front and read exactly, otherwise the
+    stream is consumed in chunks until it ends or exceeds max_bytes.
+
+    With a Content-Encoding the length is the compressed size while aiohttp yields
+    decoded bytes, so such bodies are always streamed.
+    """
+    length = resp.content_length
+    if resp.headers.get("Content-Encoding", "identity").lower() not in ("", "identity"):
+        length = None
+    if length is not None:
+        if length > max_bytes:
+            raise FrameTooLarge(length)
+        return await resp.content.readexactly(length)
+    chunks, size = [], 0
+    async for chunk in resp.content.iter_any():
+        size += len(chunk)
+        if size > max_bytes:
+            raise FrameTooLarge(size)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def _read_mjpeg_frame(resp: aiohttp.ClientResponse, max_bytes: int) -> Optional[bytes]:
+    """First JPEG of a multipart/x-mixed-replace stream; stops reading right after it.
+
+    Uses the part's Content-Length when the server sends one, else skips the header
+    segments by their lengths and scans the entropy-coded data for the end-of-image
+    marker (so an EXIF thumbnail's own EOI does not cut the frame short).
+    """
+    buf, start, length, pos, scan = bytearray(), -1, None, 0, None
+    async for chunk in resp.content.iter_any():
+        buf += chunk
+        if start < 0:
+            start = buf.find(_SOI)
+            if start < 0:
+                if len(buf) > max_bytes:
+                    raise FrameTooLarge(len(buf))
+                continue
+            m = _PART_LENGTH.search(buf, 0, start)
+            length, pos = (int(m.group(1)) if m else None), start + 2
+        if length is not None:
+            if length > max_bytes:
+                raise FrameTooLarge(length)
+            if len(buf) >= start + length:
+                return bytes(buf[start:start + length])
+        else:
+            if scan is None:
+                pos, in_scan = _skip_segments(buf, pos)
+                scan = pos if in_scan else None
+            if scan is not None:
+                end = buf.find(_EOI, scan)
+                if end >= 0:
+                    return bytes(buf[start:end + 2])
+                scan = max(scan, len(buf) - 1)  # marker may straddle two chunks
+        if len(buf) - start > max_bytes:
+            raise FrameTooLarge(len(buf) - start)
+    return None
+
+@dataclass
+class _Validator:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content: Optional[bytes] = None
+
+class SnapCamHttpClient:
+    """Keep-alive client shared by all SnapCam entries (one pool per hass)."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pool_size = 0
+        self._wanted: dict[str, int] = {}  # entry_id -> requested pool size
+        self._validators: dict[tuple[str, str], _Validator] = {}  # (entry_id, url) -> cache validators
+        self._unsub_close = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_on_close)
+
+    def register(self, entry_id: str, pool_size: int | None) -> None:
+        self._wanted[entry_id] = max(1, int(pool_size or DEFAULT_URL_POOL_SIZE))
+        if self._session is not None and max(self._wanted.values()) > self._pool_size:
+            # pool must grow: new requests use a fresh session, the old one drains first
+            self._retire(self._session)
+            self._session = None
+
+    async def async_unregister(self, entry_id: str) -> None:
+        self._wanted.pop(entry_id, None)
+        for key in [k for k in self._validators if k[0] == entry_id]:
+            self._validators.pop(key, None)
+        if not self._wanted:
+            await self.async_close()
+
+    async def async_close(self) -> None:
+        session, self._session = self._session, None
+        self._validators.clear()
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _async_on_close(self, _event) -> None:
+        self._unsub_close = None
+        await self.async_close()
+
+    def _retire(self, session: aiohttp.ClientSession) -> None:
+        @callback
+        def _close(_now) -> None:
+            if not session.closed:
+                self.hass.async_create_task(session.close())
+        async_call_later(self.hass, _RETIRE_SECONDS, _close)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._pool_size = max(self._wanted.values(), default=DEFAULT_URL_POOL_SIZE)
+            connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+            _LOGGER.debug("SnapCam: http pool created (limit=%d)", self._pool_size)
+        return self._session
+
+    async def async_fetch(self, entry_id: str, url: str, timeout: float | None = None, max_bytes: int | None = None) -> Optional[bytes]:
+        """GET url; a 304 answer returns the bytes cached from the previous 200.
+
+        Bodies larger than max_bytes are rejected; multipart/x-mixed-replace (MJPEG)
+        endpoints yield their first frame.
+        """
+        key = (entry_id, url)
+        cached = self._validators.get(key)
+        headers = {}
+        if cached and cached.content is not None:
+            if cached.etag: headers["If-None-Match"] = cached.etag
+            if cached.last_modified: headers["If-Modified-Since"] = cached.last_modified
+        client_timeout = aiohttp.ClientTimeout(total=float(timeout or DEFAULT_URL_TIMEOUT))
+        async with self._get_session().get(url, headers=headers, timeout=client_timeout) as resp:
+            if resp.status == 304 and cached is not None and cached.content is not None:
+                _LOGGER.debug("SnapCam[%s]: %s not modified (304)", entry_id, url)
+                return cached.content
+            if resp.status != 200:
+                _LOGGER.debug("SnapCam[%s]: %s returned HTTP %s", entry_id, url, resp.status)
+                return None
+            limit = max_bytes or int(DEFAULT_URL_MAX_MB * 1024 * 1024)
+            try:
+                if resp.content_type.startswith("multipart/"):
+                    content = await _read_mjpeg_frame(resp, limit)
+                    resp.close()  # endless stream: drop the connection instead of draining it
+                    return content
+                content = await _read_body(resp, limit)
+            except FrameTooLarge as err:
+                resp.close()
+                _LOGGER.warning("SnapCam[%s]: %s exceeds the max frame size (%s > %d bytes)", entry_id, url, err, limit)
+                return None
+            etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators[key] = _Validator(etag, last_modified, content)
+        else:
+            self._validators.pop(key, None)
+        return content
+
+def async_get_http_client(hass: HomeAssistant) -> SnapCamHttpClient:
+    client = hass.data.get(DATA_HTTP)
+    if client is None:
+        client = hass.data[DATA_HTTP] = SnapCamHttpClient(hass)
+    return client
@@ -7,12 +7,43 @@ from homeassistant.helpers import selector as sel
 from homeassistant.core import callback
 from .const import *
 
+def _trigger_types(kind):
+    return [TRIGGER_STATE, TRIGGER_EVENT, TRIGGER_WATCH] if kind == "file" else [TRIGGER_STATE, TRIGGER_EVENT]
+
 def _norm_pairs(data, options):
     pairs = (options.get(CONF_PAIRS) if options and isinstance(options.get(CONF_PAIRS), list) else None)
     if pairs is None:
         pairs = data.get(CONF_PAIRS, []) if data else []
     return [p for p in pairs if isinstance(p, dict)]
 
+def _condition_fields(p, state):
+    """Optional attribute / numeric threshold / template condition fields."""
+    fields = {}
+    if state:
+        fields[vol.Optional(KEY_STATE_ATTRIBUTE, description={"suggested_value": p.get(KEY_STATE_ATTRIBUTE)})] = sel.selector({"text": {}})
+        for k in (KEY_STATE_ABOVE, KEY_STATE_BELOW):
+            fields[vol.Optional(k, description={"suggested_value": p.get(k)})] = sel.selector({"number": {"mode": "box", "step": "any"}})
+    fields[vol.Optional(KEY_CONDITION, description={"suggested_value": p.get(KEY_CONDITION)})] = sel.selector({"template": {}})
+    return fields
+
+def _apply_conditions(p, user_input):
+    for k in (KEY_STATE_ATTRIBUTE, KEY_STATE_ABOVE, KEY_STATE_BELOW, KEY_CONDITION):
+        if user_input.get(k) not in (None, ""): p[k] = user_input[k]
+        else: p.pop(k, None)
+
+def _timing_fields(p, hold):
+    """Optional per-pair hold / debounce / cooldown / warm-frame prefetch / pre-roll fields (seconds)."""
+    keys = ([KEY_PAIR_FOR] if hold else []) + [KEY_PAIR_DEBOUNCE, KEY_PAIR_COOLDOWN, KEY_PAIR_PREFETCH, KEY_PAIR_PREROLL]
+    fields = {vol.Optional(k, description={"suggested_value": p.get(k)}): sel.selector({"number": {"min": 0, "max": 3600, "step": 0.5, "unit_of_measurement": "s"}}) for k in keys}
+    fields[vol.Optional(KEY_PAIR_PREFETCH_WHILE, description={"suggested_value": p.get(KEY_PAIR_PREFETCH_WHILE)})] = sel.selector({"entity": {}})
+    fields[vol.Optional(KEY_PAIR_PREROLL_PICK, description={"suggested_value": p.get(KEY_PAIR_PREROLL_PICK)})] = sel.selector({"select": {"options": PREROLL_PICKS}})
+    return fields
+
+def _apply_timing(p, user_input):
+    for k in (KEY_PAIR_FOR, KEY_PAIR_DEBOUNCE, KEY_PAIR_COOLDOWN, KEY_PAIR_PREFETCH, KEY_PAIR_PREFETCH_WHILE, KEY_PAIR_PREROLL, KEY_PAIR_PREROLL_PICK):
+        if user_input.get(k): p[k] = user_input[k]
+        else: p.pop(k, None)
+
 class SnapCamConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 20
 
@@ -57,20 +88,24 @@ class SnapCamConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_add_pair_url(self, user_input=None):
         if user_input is not None:
             self._pair_url = user_input[KEY_PAIR_URL]
+            self._pair_timeout = user_input.get(KEY_PAIR_TIMEOUT)
             return await self.async_step_add_pair_type()
 
         schema = vol.Schema({
             vol.Required(KEY_PAIR_URL): sel.selector({"text": {"placeholder": "https://example.local/local/snapshots/vehicle_detection_latest.jpg"}}),
+            vol.Optional(KEY_PAIR_TIMEOUT): sel.selector({"number": {"min": 1, "max": 60, "step": 0.5, "unit_of_measurement": "s"}}),
         })
         return self.async_show_form(step_id="add_pair_url", data_schema=schema)
 
     async def async_step_add_pair_type(self, user_input=None):
         if user_input is not None:
             self._pair_type = user_input[KEY_TRIGGER_TYPE]
+            if self._pair_type == TRIGGER_WATCH:
+                return await self.async_step_add_pair_watch()
             return await (self.async_step_add_pair_state() if self._pair_type == TRIGGER_STATE else self.async_step_add_pair_event())
 
         schema = vol.Schema({
-            vol.Required(KEY_TRIGGER_TYPE, default=TRIGGER_STATE): sel.selector({"select": {"options": [TRIGGER_STATE, TRIGGER_EVENT]}})
+            vol.Required(KEY_TRIGGER_TYPE, default=TRIGGER_STATE): sel.selector({"select": {"options": _trigger_types(getattr(self, "_pair_source_kind", "entity"))}})
         })
         return self.async_show_form(step_id="add_pair_type", data_schema=schema)
 
@@ -80,15 +115,17 @@ class SnapCamConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 KEY_PAIR_SOURCE_KIND: getattr(self, "_pair_source_kind", "entity"),
                 KEY_TRIGGER_TYPE: TRIGGER_STATE,
                 KEY_STATE_ENTITY: user_input[KEY_STATE_ENTITY],
-                KEY_STATE_TO: user_input.get(KEY_STATE_TO) or DEFAULT_TO_STATE,
+                KEY_STATE_TO: user_input.get(KEY_STATE_TO) or (None if user_input.get(KEY_STATE_ATTRIBUTE) else DEFAULT_TO_STATE),
                 KEY_STATE_FROM: user_input.get(KEY_STATE_FROM),
             }
+            _apply_conditions(pair, user_input); _apply_timing(pair, user_input)
             if self._pair_source_kind == "entity":
                 pair[KEY_PAIR_CAMERA] = user_input[KEY_PAIR_CAMERA]
             elif self._pair_source_kind == "file":
                 pair[KEY_PAIR_FILE] = getattr(self, "_pair_file", "")
             else:
                 pair[KEY_PAIR_URL] = getattr(self, "_pair_url", "")
+                if getattr(self, "_pair_timeout", None): pair[KEY_PAIR_TIMEOUT] = self._pair_timeout
 
             self._pairs.append(pair)
             if user_input.get("add_another"): return await self.async_step_add_pair_source()
@@ -104,6 +141,8 @@ class SnapCamConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Required(KEY_STATE_ENTITY): sel.selector({"entity": {"filter": [{"domain": "binary_sensor"}, {"domain": "sensor"}, {"domain": "person"}, {"domain": "device_tracker"}]}}),
             vol.Optional(KEY_STATE_TO, default=DEFAULT_TO_STATE): sel.selector({"text": {}}),
             vol.Optional(KEY_STATE_FROM): sel.selector({"text": {}}),
+            **_condition_fields({}, True),
+            **_timing_fields({}, True),
             vol.Optional("add_another", default=False): sel.selector({"boolean": {}}),
         })
         return self.async_show_form(step_id="add_pair_state", data_schema=schema)
@@ -121,12 +160,14 @@ class SnapCamConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 KEY_EVENT_TYPE: user_input[KEY_EVENT_TYPE],
                 KEY_EVENT_DATA: edata,
             }
+            _apply_conditions(pair, user_input); _apply_timing(pair, user_input)
             if self._pair_source_kind == "entity":
                 pair[KEY_PAIR_CAMERA] = user_input[KEY_PAIR_CAMERA]
             elif self._pair_source_kind == "file":
                 pair[KEY_PAIR_FILE] = getattr(self, "_pair_file", "")
             else:
                 pair[KEY_PAIR_URL] = getattr(self, "_pair_url", "")
+                if getattr(self, "_pair_timeout", None): pair[KEY_PAIR_TIMEOUT] = self._pair_timeout
 
             self._pairs.append(pair)
             if user_input.get("add_another"): return await self.async_step_add_pair_source()
@@ -141,10 +182,28 @@ class SnapCamConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             **base_fields,
             vol.Required(KEY_EVENT_TYPE): sel.selector({"text": {}}),
             vol.Optional(KEY_EVENT_DATA): sel.selector({"text": {}}),
+            **_condition_fields({}, False),
+            **_timing_fields({}, False),
             vol.Optional("add_another", default=False): sel.selector({"boolean": {}}),
         })
         return self.async_show_form(step_id="add_pair_event", data_schema=schema)
 
+    async def async_step_add_pair_watch(self, user_input=None):
+        if user_input is not None:
+            self._pairs.append({
+                KEY_PAIR_SOURCE_KIND: "file",
+                KEY_TRIGGER_TYPE: TRIGGER_WATCH,
+                KEY_PAIR_FILE: getattr(self, "_pair_file", ""),
+            })
+            if user_input.get("add_another"): return await self.async_step_add_pair_source()
+            data = dict(self._base); data[CONF_PAIRS] = self._pairs
+            return self.async_create_entry(title=str(self._base.get(CONF_CAM_NAME, "SnapCam")), data=data)
+
+        schema = vol.Schema({
+            vol.Optional("add_another", default=False): sel.selector({"boolean": {}}),
+        })
+        return self.async_show_form(step_id="add_pair_watch", data_schema=schema)
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -190,12 +249,48 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             if CONF_DELAY_MIN in user_input: data[CONF_DELAY_MIN] = user_input[CONF_DELAY_MIN]
             if CONF_CAM_DESCRIPTION in user_input: data[CONF_CAM_DESCRIPTION] = user_input[CONF_CAM_DESCRIPTION]
             if CONF_CREATE_LAST in user_input: data[CONF_CREATE_LAST] = user_input[CONF_CREATE_LAST]
+            if CONF_DROP_DUPLICATES in user_input: data[CONF_DROP_DUPLICATES] = user_input[CONF_DROP_DUPLICATES]
+            if CONF_PERSIST in user_input: data[CONF_PERSIST] = user_input[CONF_PERSIST]
+            if CONF_RECORD_PAIRS in user_input: data[CONF_RECORD_PAIRS] = user_input[CONF_RECORD_PAIRS]
+            if CONF_CHANGE_THRESHOLD in user_input: data[CONF_CHANGE_THRESHOLD] = user_input[CONF_CHANGE_THRESHOLD]
+            if CONF_URL_TIMEOUT in user_input: data[CONF_URL_TIMEOUT] = user_input[CONF_URL_TIMEOUT]
+            if CONF_URL_POOL_SIZE in user_input: data[CONF_URL_POOL_SIZE] = int(user_input[CONF_URL_POOL_SIZE])
+            if CONF_URL_MAX_MB in user_input: data[CONF_URL_MAX_MB] = user_input[CONF_URL_MAX_MB]
+            if CONF_FETCH_CONCURRENCY in user_input: data[CONF_FETCH_CONCURRENCY] = int(user_input[CONF_FETCH_CONCURRENCY])
+            if CONF_SOURCE_RATE in user_input: data[CONF_SOURCE_RATE] = user_input[CONF_SOURCE_RATE]
+            if CONF_RESIZE_QUALITY in user_input: data[CONF_RESIZE_QUALITY] = int(user_input[CONF_RESIZE_QUALITY])
+            if CONF_OUTPUT_FORMAT in user_input: data[CONF_OUTPUT_FORMAT] = user_input[CONF_OUTPUT_FORMAT]
+            if CONF_STREAM_KEEPALIVE in user_input: data[CONF_STREAM_KEEPALIVE] = user_input[CONF_STREAM_KEEPALIVE]
+            if CONF_BURST_MODE in user_input: data[CONF_BURST_MODE] = user_input[CONF_BURST_MODE]
+            if CONF_BURST_PARALLEL in user_input: data[CONF_BURST_PARALLEL] = int(user_input[CONF_BURST_PARALLEL])
+            if CONF_BURST_DEADLINE in user_input: data[CONF_BURST_DEADLINE] = user_input[CONF_BURST_DEADLINE]
+            if CONF_BURST_MOSAIC in user_input: data[CONF_BURST_MOSAIC] = user_input[CONF_BURST_MOSAIC]
+            if CONF_HISTORY_DEPTH in user_input: data[CONF_HISTORY_DEPTH] = int(user_input[CONF_HISTORY_DEPTH])
+            if CONF_HISTORY_MAX_MB in user_input: data[CONF_HISTORY_MAX_MB] = user_input[CONF_HISTORY_MAX_MB]
             return self.async_create_entry(title="", data=data)
 
         schema = vol.Schema({
             vol.Required(CONF_DELAY_MIN, default=data.get(CONF_DELAY_MIN, DEFAULT_DELAY_MIN)): sel.selector({"number": {"min": 0, "max": MAX_DELAY_MIN, "step": 1}}),
             vol.Optional(CONF_CAM_DESCRIPTION, default=data.get(CONF_CAM_DESCRIPTION, "")): sel.selector({"text": {}}),
             vol.Optional(CONF_CREATE_LAST, default=data.get(CONF_CREATE_LAST, False)): sel.selector({"boolean": {}}),
+            vol.Optional(CONF_PERSIST, default=data.get(CONF_PERSIST, False)): sel.selector({"boolean": {}}),
+            vol.Optional(CONF_RECORD_PAIRS, default=data.get(CONF_RECORD_PAIRS, DEFAULT_RECORD_PAIRS)): sel.selector({"boolean": {}}),
+            vol.Optional(CONF_DROP_DUPLICATES, default=data.get(CONF_DROP_DUPLICATES, DEFAULT_DROP_DUPLICATES)): sel.selector({"boolean": {}}),
+            vol.Optional(CONF_CHANGE_THRESHOLD, default=data.get(CONF_CHANGE_THRESHOLD, DEFAULT_CHANGE_THRESHOLD)): sel.selector({"number": {"min": 0, "max": 50, "step": 0.5, "unit_of_measurement": "%"}}),
+            vol.Optional(CONF_URL_TIMEOUT, default=data.get(CONF_URL_TIMEOUT, DEFAULT_URL_TIMEOUT)): sel.selector({"number": {"min": 1, "max": 60, "step": 0.5, "unit_of_measurement": "s"}}),
+            vol.Optional(CONF_URL_POOL_SIZE, default=data.get(CONF_URL_POOL_SIZE, DEFAULT_URL_POOL_SIZE)): sel.selector({"number": {"min": 1, "max": 100, "step": 1}}),
+            vol.Optional(CONF_URL_MAX_MB, default=data.get(CONF_URL_MAX_MB, DEFAULT_URL_MAX_MB)): sel.selector({"number": {"min": 1, "max": 100, "step": 1, "unit_of_measurement": "MB"}}),
+            vol.Optional(CONF_FETCH_CONCURRENCY, default=data.get(CONF_FETCH_CONCURRENCY, DEFAULT_FETCH_CONCURRENCY)): sel.selector({"number": {"min": 1, "max": 64, "step": 1}}),
+            vol.Optional(CONF_SOURCE_RATE, default=data.get(CONF_SOURCE_RATE, DEFAULT_SOURCE_RATE)): sel.selector({"number": {"min": 0, "max": 600, "step": 1, "unit_of_measurement": "/min"}}),
+            vol.Optional(CONF_RESIZE_QUALITY, default=data.get(CONF_RESIZE_QUALITY, DEFAULT_RESIZE_QUALITY)): sel.selector({"number": {"min": 30, "max": 95, "step": 5}}),
+            vol.Optional(CONF_OUTPUT_FORMAT, default=data.get(CONF_OUTPUT_FORMAT, DEFAULT_OUTPUT_FORMAT)): sel.selector({"select": {"options": OUTPUT_FORMATS}}),
+            vol.Optional(CONF_BURST_MODE, default=data.get(CONF_BURST_MODE, False)): sel.selector({"boolean": {}}),
+            vol.Optional(CONF_BURST_PARALLEL, default=data.get(CONF_BURST_PARALLEL, DEFAULT_BURST_PARALLEL)): sel.selector({"number": {"min": 1, "max": 16, "step": 1}}),
+            vol.Optional(CONF_BURST_DEADLINE, default=data.get(CONF_BURST_DEADLINE, DEFAULT_BURST_DEADLINE)): sel.selector({"number": {"min": 0.1, "max": 10, "step": 0.1, "unit_of_measurement": "s"}}),
+            vol.Optional(CONF_BURST_MOSAIC, default=data.get(CONF_BURST_MOSAIC, False)): sel.selector({"boolean": {}}),
+            vol.Optional(CONF_STREAM_KEEPALIVE, default=data.get(CONF_STREAM_KEEPALIVE, DEFAULT_STREAM_KEEPALIVE)): sel.selector({"number": {"min": 0, "max": 300, "step": 1, "unit_of_measurement": "s"}}),
+            vol.Optional(CONF_HISTORY_DEPTH, default=data.get(CONF_HISTORY_DEPTH, DEFAULT_HISTORY_DEPTH)): sel.selector({"number": {"min": 0, "max": MAX_HISTORY_DEPTH, "step": 1}}),
+            vol.Optional(CONF_HISTORY_MAX_MB, default=data.get(CONF_HISTORY_MAX_MB, DEFAULT_HISTORY_MAX_MB)): sel.selector({"number": {"min": 1, "max": 200, "step": 1, "unit_of_measurement": "MB"}}),
         })
         return self.async_show_form(step_id="edit_general", data_schema=schema)
 
@@ -214,11 +309,13 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             self._temp_pair[KEY_TRIGGER_TYPE] = user_input[KEY_TRIGGER_TYPE]
             if user_input[KEY_TRIGGER_TYPE] == TRIGGER_STATE:
                 return await self.async_step_pair_state_new()
+            elif user_input[KEY_TRIGGER_TYPE] == TRIGGER_WATCH:
+                return await self.async_step_pair_watch_new()
             else:
                 return await self.async_step_pair_event_new()
 
         schema = vol.Schema({
-            vol.Required(KEY_TRIGGER_TYPE, default=TRIGGER_STATE): sel.selector({"select": {"options": [TRIGGER_STATE, TRIGGER_EVENT]}})
+            vol.Required(KEY_TRIGGER_TYPE, default=TRIGGER_STATE): sel.selector({"select": {"options": _trigger_types(self._temp_pair.get(KEY_PAIR_SOURCE_KIND))}})
         })
         return self.async_show_form(step_id="pair_trigger_type_new", data_schema=schema)
 
@@ -226,12 +323,13 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
         if user_input is not None:
             p = dict(self._temp_pair)
             p[KEY_STATE_ENTITY] = user_input[KEY_STATE_ENTITY]
-            p[KEY_STATE_TO] = user_input.get(KEY_STATE_TO) or DEFAULT_TO_STATE
+            p[KEY_STATE_TO] = user_input.get(KEY_STATE_TO) or (None if user_input.get(KEY_STATE_ATTRIBUTE) else DEFAULT_TO_STATE)
             p[KEY_STATE_FROM] = user_input.get(KEY_STATE_FROM)
+            _apply_conditions(p, user_input); _apply_timing(p, user_input)
             kind = p[KEY_PAIR_SOURCE_KIND]
             if kind == "entity": p[KEY_PAIR_CAMERA] = user_input[KEY_PAIR_CAMERA]
             if kind == "file": p[KEY_PAIR_FILE] = user_input[KEY_PAIR_FILE]
-            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]
+            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]; p[KEY_PAIR_TIMEOUT] = user_input.get(KEY_PAIR_TIMEOUT)
             self._pairs.append(p)
             return await self.async_step_menu()
 
@@ -243,12 +341,15 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             base_fields[vol.Required(KEY_PAIR_FILE)] = sel.selector({"text": {"placeholder": "/local/snapshots/..."}})
         else:
             base_fields[vol.Required(KEY_PAIR_URL)] = sel.selector({"text": {"placeholder": "https://..."}})
+            base_fields[vol.Optional(KEY_PAIR_TIMEOUT)] = sel.selector({"number": {"min": 1, "max": 60, "step": 0.5, "unit_of_measurement": "s"}})
 
         schema = vol.Schema({
             **base_fields,
             vol.Required(KEY_STATE_ENTITY): sel.selector({"entity": {"filter": [{"domain": "binary_sensor"}, {"domain": "sensor"}, {"domain": "person"}, {"domain": "device_tracker"}]}}),
             vol.Optional(KEY_STATE_TO, default=DEFAULT_TO_STATE): sel.selector({"text": {}}),
             vol.Optional(KEY_STATE_FROM): sel.selector({"text": {}}),
+            **_condition_fields({}, True),
+            **_timing_fields({}, True),
         })
         return self.async_show_form(step_id="pair_state_new", data_schema=schema)
 
@@ -261,10 +362,11 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
                 try: edata = json.loads(user_input[KEY_EVENT_DATA])
                 except Exception: edata = None
             p[KEY_EVENT_DATA] = edata
+            _apply_conditions(p, user_input); _apply_timing(p, user_input)
             kind = p[KEY_PAIR_SOURCE_KIND]
             if kind == "entity": p[KEY_PAIR_CAMERA] = user_input[KEY_PAIR_CAMERA]
             if kind == "file": p[KEY_PAIR_FILE] = user_input[KEY_PAIR_FILE]
-            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]
+            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]; p[KEY_PAIR_TIMEOUT] = user_input.get(KEY_PAIR_TIMEOUT)
             self._pairs.append(p)
             return await self.async_step_menu()
 
@@ -276,14 +378,29 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             base_fields[vol.Required(KEY_PAIR_FILE)] = sel.selector({"text": {"placeholder": "/local/snapshots/..."}})
         else:
             base_fields[vol.Required(KEY_PAIR_URL)] = sel.selector({"text": {"placeholder": "https://..."}})
+            base_fields[vol.Optional(KEY_PAIR_TIMEOUT)] = sel.selector({"number": {"min": 1, "max": 60, "step": 0.5, "unit_of_measurement": "s"}})
 
         schema = vol.Schema({
             **base_fields,
             vol.Required(KEY_EVENT_TYPE): sel.selector({"text": {}}),
             vol.Optional(KEY_EVENT_DATA): sel.selector({"text": {}}),
+            **_condition_fields({}, False),
+            **_timing_fields({}, False),
         })
         return self.async_show_form(step_id="pair_event_new", data_schema=schema)
 
+    async def async_step_pair_watch_new(self, user_input=None):
+        if user_input is not None:
+            p = dict(self._temp_pair)
+            p[KEY_PAIR_FILE] = user_input[KEY_PAIR_FILE]
+            self._pairs.append(p)
+            return await self.async_step_menu()
+
+        schema = vol.Schema({
+            vol.Required(KEY_PAIR_FILE): sel.selector({"text": {"placeholder": "/local/snapshots/..."}}),
+        })
+        return self.async_show_form(step_id="pair_watch_new", data_schema=schema)
+
     async def async_step_pick_pair_to_edit(self, user_input=None):
         if not self._pairs:
             return await self.async_step_menu()
@@ -295,6 +412,8 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             self._temp_pair = dict(p)
             if p.get(KEY_TRIGGER_TYPE) == TRIGGER_STATE:
                 return await self.async_step_pair_state_edit()
+            elif p.get(KEY_TRIGGER_TYPE) == TRIGGER_WATCH:
+                return await self.async_step_pair_watch_edit()
             else:
                 return await self.async_step_pair_event_edit()
 
@@ -307,12 +426,13 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
         p = self._temp_pair
         if user_input is not None:
             p[KEY_STATE_ENTITY] = user_input[KEY_STATE_ENTITY]
-            p[KEY_STATE_TO] = user_input.get(KEY_STATE_TO) or DEFAULT_TO_STATE
+            p[KEY_STATE_TO] = user_input.get(KEY_STATE_TO) or (None if user_input.get(KEY_STATE_ATTRIBUTE) else DEFAULT_TO_STATE)
             p[KEY_STATE_FROM] = user_input.get(KEY_STATE_FROM)
+            _apply_conditions(p, user_input); _apply_timing(p, user_input)
             kind = p.get(KEY_PAIR_SOURCE_KIND, "entity")
             if kind == "entity": p[KEY_PAIR_CAMERA] = user_input[KEY_PAIR_CAMERA]
             if kind == "file": p[KEY_PAIR_FILE] = user_input[KEY_PAIR_FILE]
-            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]
+            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]; p[KEY_PAIR_TIMEOUT] = user_input.get(KEY_PAIR_TIMEOUT)
             self._pairs[self._editing_index] = p
             return await self.async_step_menu()
 
@@ -324,12 +444,15 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             base_fields[vol.Required(KEY_PAIR_FILE, default=p.get(KEY_PAIR_FILE,""))] = sel.selector({"text": {}})
         else:
             base_fields[vol.Required(KEY_PAIR_URL, default=p.get(KEY_PAIR_URL,""))] = sel.selector({"text": {}})
+            base_fields[vol.Optional(KEY_PAIR_TIMEOUT, description={"suggested_value": p.get(KEY_PAIR_TIMEOUT)})] = sel.selector({"number": {"min": 1, "max": 60, "step": 0.5, "unit_of_measurement": "s"}})
 
         schema = vol.Schema({
             **base_fields,
             vol.Required(KEY_STATE_ENTITY, default=p.get(KEY_STATE_ENTITY,"")): sel.selector({"entity": {"filter": [{"domain": "binary_sensor"}, {"domain": "sensor"}, {"domain": "person"}, {"domain": "device_tracker"}]}}),
-            vol.Optional(KEY_STATE_TO, default=p.get(KEY_STATE_TO, DEFAULT_TO_STATE)): sel.selector({"text": {}}),
+            vol.Optional(KEY_STATE_TO, default=p.get(KEY_STATE_TO) or ""): sel.selector({"text": {}}),
             vol.Optional(KEY_STATE_FROM, default=p.get(KEY_STATE_FROM, "")): sel.selector({"text": {}}),
+            **_condition_fields(p, True),
+            **_timing_fields(p, True),
         })
         return self.async_show_form(step_id="pair_state_edit", data_schema=schema)
 
@@ -342,10 +465,11 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
                 try: edata = json.loads(user_input[KEY_EVENT_DATA])
                 except Exception: edata = None
             p[KEY_EVENT_DATA] = edata
+            _apply_conditions(p, user_input); _apply_timing(p, user_input)
             kind = p.get(KEY_PAIR_SOURCE_KIND, "entity")
             if kind == "entity": p[KEY_PAIR_CAMERA] = user_input[KEY_PAIR_CAMERA]
             if kind == "file": p[KEY_PAIR_FILE] = user_input[KEY_PAIR_FILE]
-            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]
+            if kind == "url": p[KEY_PAIR_URL] = user_input[KEY_PAIR_URL]; p[KEY_PAIR_TIMEOUT] = user_input.get(KEY_PAIR_TIMEOUT)
             self._pairs[self._editing_index] = p
             return await self.async_step_menu()
 
@@ -357,14 +481,29 @@ class SnapCamOptionsFlow(config_entries.OptionsFlow):
             base_fields[vol.Required(KEY_PAIR_FILE, default=p.get(KEY_PAIR_FILE,""))] = sel.selector({"text": {}})
         else:
             base_fields[vol.Required(KEY_PAIR_URL, default=p.get(KEY_PAIR_URL,""))] = sel.selector({"text": {}})
+            base_fields[vol.Optional(KEY_PAIR_TIMEOUT, description={"suggested_value": p.get(KEY_PAIR_TIMEOUT)})] = sel.selector({"number": {"min": 1, "max": 60, "step": 0.5, "unit_of_measurement": "s"}})
 
         schema = vol.Schema({
             **base_fields,
             vol.Required(KEY_EVENT_TYPE, default=p.get(KEY_EVENT_TYPE,"")): sel.selector({"text": {}}),
             vol.Optional(KEY_EVENT_DATA, default=json.dumps(p.get(KEY_EVENT_DATA)) if p.get(KEY_EVENT_DATA) else ""): sel.selector({"text": {}}),
+            **_condition_fields(p, False),
+            **_timing_fields(p, False),
         })
         return self.async_show_form(step_id="pair_event_edit", data_schema=schema)
 
+    async def async_step_pair_watch_edit(self, user_input=None):
+        p = self._temp_pair
+        if user_input is not None:
+            p[KEY_PAIR_FILE] = user_input[KEY_PAIR_FILE]
+            self._pairs[self._editing_index] = p
+            return await self.async_step_menu()
+
+        schema = vol.Schema({
+            vol.Required(KEY_PAIR_FILE, default=p.get(KEY_PAIR_FILE,"")): sel.selector({"text": {}}),
+        })
+        return self.async_show_form(step_id="pair_watch_edit", data_schema=schema)
+
     async def async_step_pick_pair_to_remove(self, user_input=None):
         if not self._pairs:
             return await self.async_step_menu()
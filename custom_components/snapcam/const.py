@@ -7,6 +7,10 @@ CONF_CAM_NAME = "cam_name"
 CONF_CAM_DESCRIPTION = "cam_description"
 CONF_DELAY_MIN = "delay_min"              # cooldown minutes
 CONF_CREATE_LAST = "create_last_camera"
+CONF_PERSIST = "persist_snapshots"       # opt-in disk cache of current/last across restarts
+CONF_DROP_DUPLICATES = "drop_duplicates"  # skip rotation/state write for identical frames
+CONF_CHANGE_THRESHOLD = "change_threshold"  # % scene difference needed to accept a frame, 0 = off
+CONF_RECORD_PAIRS = "record_pairs"        # store the static `pairs` attribute in the recorder
 
 # Trigger pairs list
 CONF_PAIRS = "pairs"
@@ -14,16 +18,29 @@ KEY_PAIR_SOURCE_KIND = "pair_source_kind"  # entity | file | url
 KEY_PAIR_CAMERA = "pair_camera"            # when kind=entity
 KEY_PAIR_FILE = "pair_file"                # when kind=file
 KEY_PAIR_URL = "pair_url"                  # when kind=url
+KEY_PAIR_TIMEOUT = "pair_timeout"          # optional per-pair url timeout (s)
+KEY_PAIR_FOR = "for"                       # s the state must hold before the pair fires
+KEY_PAIR_DEBOUNCE = "debounce"             # s; after firing, ignore matches until quiet this long
+KEY_PAIR_COOLDOWN = "pair_cooldown"        # s; minimum gap between firings of this pair
+KEY_PAIR_PREFETCH = "prefetch"             # s; keep a warm frame of this source, 0 = off
+KEY_PAIR_PREFETCH_WHILE = "prefetch_while" # optional entity; prefetch only while it is on/home/open/armed_*
+KEY_PAIR_PREROLL = "preroll"               # s; on trigger commit a frame sampled up to this long before it, 0 = off
+KEY_PAIR_PREROLL_PICK = "preroll_pick"     # earliest | best (largest encoded frame = most detail)
 
 # Trigger schema (automation-like)
 KEY_TRIGGER_TYPE = "trigger_type"        # "state" | "event"
 TRIGGER_STATE = "state"
 TRIGGER_EVENT = "event"
+TRIGGER_WATCH = "watch"                  # file pairs: fire when the file is replaced
 
 # state trigger
 KEY_STATE_ENTITY = "entity_id"
-KEY_STATE_TO = "to"
-KEY_STATE_FROM = "from"
+KEY_STATE_TO = "to"                      # one value or a comma-separated list
+KEY_STATE_FROM = "from"                  # one value or a comma-separated list
+KEY_STATE_ATTRIBUTE = "attribute"        # match this attribute instead of the state
+KEY_STATE_ABOVE = "above"                # numeric: fire when the value crosses into (above, below);
+KEY_STATE_BELOW = "below"                #   `to` is ignored when a threshold is set
+KEY_CONDITION = "condition"              # optional template; must render true (state + event pairs)
 
 # event trigger
 KEY_EVENT_TYPE = "event_type"
@@ -31,8 +48,94 @@ KEY_EVENT_DATA = "event_data"            # JSON (dict) optional
 
 DEFAULT_TO_STATE = "on"  # default for state trigger
 DEFAULT_DELAY_MIN = 15
+DEFAULT_DROP_DUPLICATES = True
+DEFAULT_RECORD_PAIRS = True
+DEFAULT_CHANGE_THRESHOLD = 0.0
+CHANGE_THUMB_SIZE = (32, 32)  # grayscale downsample compared by the change gate
 MAX_DELAY_MIN = 30
+WHEEL_TICK_S = 0.25                       # trigger timer wheel resolution
+WHEEL_SLOTS = 512                         # one revolution = 128 s; longer timers take extra rounds
+
+# URL sources (shared keep-alive client)
+CONF_URL_TIMEOUT = "url_timeout"          # seconds, default for url pairs
+CONF_URL_POOL_SIZE = "url_pool_size"      # max pooled connections (hass-wide)
+CONF_URL_MAX_MB = "url_max_frame_mb"      # larger bodies are aborted; MJPEG urls yield one frame
+DEFAULT_URL_TIMEOUT = 5.0
+DEFAULT_URL_POOL_SIZE = 10
+DEFAULT_URL_MAX_MB = 10
+
+# Fetch limits
+CONF_FETCH_CONCURRENCY = "fetch_concurrency"  # hass-wide concurrent fetches (largest entry value wins)
+CONF_SOURCE_RATE = "source_rate"          # max fetches per minute per source, 0 = unlimited
+DEFAULT_FETCH_CONCURRENCY = 8
+DEFAULT_SOURCE_RATE = 0
+SOURCE_BURST = 2.0                        # token bucket capacity per source
+
+# Thumbnails for async_camera_image(width, height)
+CONF_RESIZE_QUALITY = "resize_quality"    # quality of resized / transcoded frames
+DEFAULT_RESIZE_QUALITY = 75
+CONF_OUTPUT_FORMAT = "output_format"      # serve frames as-is or transcoded (cached per frame)
+OUTPUT_FORMATS = ["original", "jpeg", "webp"]
+DEFAULT_OUTPUT_FORMAT = "original"
+RESIZE_CACHE_SIZE = 32                    # resized frames kept per entry (LRU)
+
+# Burst capture (all pairs of an entry in parallel)
+CONF_BURST_MODE = "burst_mode"            # every trigger fetches all sources
+CONF_BURST_PARALLEL = "burst_parallel"    # max concurrent fetches per burst
+CONF_BURST_DEADLINE = "burst_deadline"    # seconds; late sources are left out
+CONF_BURST_MOSAIC = "burst_mosaic"        # store a grid of all frames as the snapshot
+DEFAULT_BURST_PARALLEL = 4
+DEFAULT_BURST_DEADLINE = 2.0
+MOSAIC_TILE_WIDTH = 640
+
+# MJPEG push stream
+CONF_STREAM_KEEPALIVE = "stream_keepalive"  # re-send current frame every N s, 0 = only on new frames
+DEFAULT_STREAM_KEEPALIVE = 0
+
+# Pre-trigger ring per pair (sampled every `prefetch` s, else PREROLL_INTERVAL_S)
+PREROLL_PICKS = ["earliest", "best"]
+PREROLL_INTERVAL_S = 1.0
+PREROLL_MAX_FRAMES = 30                   # per pair
+PREROLL_MAX_MB = 8                        # per pair
+PREROLL_GLOBAL_MAX_BYTES = 64 * 1024 * 1024  # all pre-roll rings together
+PREROLL_IDLE_S = 120                      # without a prefetch_while entity: sample only if viewed this recently
+
+# In-RAM snapshot history (ring buffer)
+CONF_HISTORY_DEPTH = "history_depth"      # frames kept per entry, 0 = off
+CONF_HISTORY_MAX_MB = "history_max_mb"    # byte budget per entry
+DEFAULT_HISTORY_DEPTH = 0
+DEFAULT_HISTORY_MAX_MB = 20
+MAX_HISTORY_DEPTH = 100
+HISTORY_GLOBAL_MAX_BYTES = 256 * 1024 * 1024  # ceiling across all entries
+
+# File watch trigger (inotify, stat polling as fallback)
+WATCH_POLL_S = 2.0
+
+# Initial snapshots at startup (hass-wide)
+STARTUP_CONCURRENCY = 3                   # initial snapshots running at once
+STARTUP_JITTER_S = 2.0                    # random delay before each one
+
+# Opt-in snapshot cache on disk
+SPILL_DIR = ".storage/snapcam"
+SPILL_DEBOUNCE_S = 30.0                   # batch disk writes (SD cards)
+SPILL_COMPACT_FACTOR = 3                  # rewrite segment when > 3x live bytes
+SPILL_RETRY_MAX_S = 600.0                 # failed writes retry with doubling delay up to this
+
+# Instrumentation
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Source fetch deduplication across entries
+BROKER_WINDOW_S = 1.0                     # a fetched frame is shared for this long
 
 DATA_ENTITIES = f"{DOMAIN}_entities"  # per entry_id: list of camera entities
 DATA_STORES = f"{DOMAIN}_stores"      # per entry_id: shared store among entities
+DATA_HTTP = f"{DOMAIN}_http"          # hass-wide pooled http client
+DATA_HISTORY_BUDGET = f"{DOMAIN}_history_budget"  # hass-wide history byte ceiling
+DATA_BROKER = f"{DOMAIN}_broker"      # hass-wide source fetch broker
+DATA_SPILL = f"{DOMAIN}_spill"        # hass-wide on-disk snapshot cache
+DATA_STARTUP = f"{DOMAIN}_startup"    # hass-wide initial snapshot queue
+DATA_LIMITER = f"{DOMAIN}_limiter"    # hass-wide fetch concurrency / rate limiter
+DATA_WATCHER = f"{DOMAIN}_watcher"    # hass-wide watchdog observer for watch triggers
+DATA_TIMERS = f"{DOMAIN}_timers"      # hass-wide trigger timer wheel
+DATA_PREROLL_BUDGET = f"{DOMAIN}_preroll_budget"  # hass-wide pre-roll byte ceiling
 PULSE_SECONDS = 5.0
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY, CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_STORES, DATA_BROKER, DATA_HTTP, DATA_LIMITER, DATA_PREROLL_BUDGET, KEY_PAIR_URL
+
+TO_REDACT = {KEY_PAIR_URL, CONF_PASSWORD, CONF_USERNAME, CONF_TOKEN, CONF_API_KEY}
+
+def _redact_url(value: str) -> str:
+    """Scheme, host and path only: user info and every query value (usr/pwd/token/auth...) are masked."""
+    try:
+        parts = urlsplit(value)
+        netloc = parts.netloc.rpartition("@")[2]
+    except ValueError:
+        return REDACTED
+    if "@" in parts.netloc:
+        netloc = f"{REDACTED}@{netloc}"
+    query = "&".join(f"{k}={REDACTED}" for k, _ in parse_qsl(parts.query, keep_blank_values=True))
+    return urlunsplit((parts.scheme, netloc, parts.path, query, ""))
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    data = dict(entry.data); data.update(entry.options)
+    store = hass.data.get(DATA_STORES, {}).get(entry.entry_id)
+    result: dict[str, Any] = {"config": async_redact_data(data, TO_REDACT)}
+    if store is not None:
+        metrics = store.metrics.as_dict()
+        metrics["by_pair"] = {_redact_url(k): v for k, v in metrics["by_pair"].items()}
+        sched = store.scheduler
+        result["store"] = {
+            "current_bytes": store.current.nbytes if store.current else 0,
+            "current_dimensions": await hass.async_add_executor_job(lambda: store.current.dimensions) if store.current else None,
+            "last_bytes": store.last.nbytes if store.last else 0,
+            "generation": store.generation,
+            "last_update": store.last_update_ts.isoformat() if store.last_update_ts else None,
+            "frames_seen": store.frames_seen, "duplicates": store.duplicates, "unchanged": store.unchanged,
+            "history": {"slots": len(store.history), "bytes": store.history.nbytes} if store.history is not None else None,
+        }
+        result["scheduler"] = {"started": sched.started, "coalesced": sched.coalesced, "skipped": sched.skipped} if sched else None
+        result["metrics"] = metrics
+    broker = hass.data.get(DATA_BROKER)
+    if broker is not None:
+        result["broker"] = {"fetches": broker.fetches, "shared": broker.shared}
+    limiter = hass.data.get(DATA_LIMITER)
+    if limiter is not None:
+        result["limiter"] = limiter.as_dict()
+    preroll = hass.data.get(DATA_PREROLL_BUDGET)
+    if preroll is not None:
+        result["preroll"] = {"rings": len(preroll.rings), "bytes": preroll.used, "max_bytes": preroll.max_bytes}
+    client = hass.data.get(DATA_HTTP)
+    if client is not None:
+        result["http"] = {"pool_size": client._pool_size, "validators": len(client._validators)}
+    return result
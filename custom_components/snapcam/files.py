@@ -0,0 +1,195 @@
+from __future__ import annotations
+from typing import Any, Callable, Optional
+from datetime import timedelta
+from pathlib import Path
+import asyncio, logging, os, stat
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+try:  # inotify (Linux) via watchdog, which Home Assistant already ships for folder_watcher
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    FileSystemEventHandler = object
+    Observer = None
+
+from .const import DATA_WATCHER, WATCH_POLL_S
+
+_LOGGER = logging.getLogger(__name__)
+_UNSET = object()
+
+def _signature(st: os.stat_result) -> tuple[int, int, int]:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+class FileSource:
+    """File reader that skips the read while (mtime_ns, size, inode) is unchanged."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._sig: Optional[tuple[int, int, int]] = None
+        self._content: Optional[bytes] = None
+        self.reads = 0
+        self.unchanged = 0
+
+    def read(self) -> Optional[bytes]:
+        """Blocking; run in the executor."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._sig = self._content = None
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        if self._content is not None and _signature(st) == self._sig:
+            self.unchanged += 1
+            return self._content
+        with open(self.path, "rb") as fh:
+            sig = _signature(os.fstat(fh.fileno()))  # stat of the inode actually read
+            content = fh.read()
+        self._sig, self._content = sig, content
+        self.reads += 1
+        return content
+
+    def signature(self) -> Optional[tuple[int, int, int]]:
+        """Blocking; current (mtime_ns, size, inode) or None if missing."""
+        try:
+            return _signature(os.stat(self.path))
+        except OSError:
+            return None
+
+class _Handler(FileSystemEventHandler):
+    """Dispatches close-after-write and rename-onto events of one directory to its targets."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        super().__init__()
+        self.hass = hass
+        self.targets: dict[str, list[Callable[[], None]]] = {}  # abs path -> callbacks
+
+    def on_any_event(self, event) -> None:
+        # only complete files: close_write (in-place writers) or an atomic rename onto the path
+        if event.is_directory or event.event_type not in ("closed", "moved"):
+            return
+        target = getattr(event, "dest_path", None) if event.event_type == "moved" else event.src_path
+        callbacks = self.targets.get(os.path.abspath(target)) if target else None
+        for cb in tuple(callbacks or ()):
+            self.hass.loop.call_soon_threadsafe(cb)
+
+class _Watcher:
+    """One watchdog Observer per hass, one watch per directory.
+
+    Bookkeeping happens in the loop; Observer start/schedule/unschedule/stop block
+    (unschedule joins the emitter thread), so they run in the executor one after the
+    other, in the order they were requested.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._observer = None
+        self._dirs: dict[str, tuple[asyncio.Task, _Handler]] = {}  # directory -> (schedule op -> ObservedWatch, handler)
+        self._last_op: Optional[asyncio.Task] = None
+
+    def _op(self, func: Callable[..., Any], *args: Any) -> asyncio.Task:
+        prev = self._last_op
+
+        async def _run() -> Any:
+            if prev is not None:
+                await asyncio.wait((prev,))
+            try:
+                return await self.hass.async_add_executor_job(func, *args)
+            except Exception as err:
+                _LOGGER.warning("SnapCam: file watch %s failed: %s", func.__name__, err)
+                return None
+        task = self._last_op = self.hass.async_create_task(_run())
+        return task
+
+    # ---- blocking (executor) ----
+    def _schedule(self, handler: _Handler, directory: str) -> Any:
+        if self._observer is None:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.start()
+        return self._observer.schedule(handler, directory, recursive=False)
+
+    def _unschedule(self, scheduled: asyncio.Task) -> None:
+        watch = scheduled.result()  # done: ops run in order
+        if watch is not None and self._observer is not None:
+            self._observer.unschedule(watch)
+
+    def _stop(self) -> None:
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop(); observer.join(5)
+
+    # ---- loop side ----
+    def add(self, path: str, on_change: Callable[[], None]) -> Callable[[], None]:
+        directory = os.path.dirname(path)
+        if directory not in self._dirs:
+            handler = _Handler(self.hass)
+            self._dirs[directory] = (self._op(self._schedule, handler, directory), handler)
+        handler = self._dirs[directory][1]
+        handler.targets.setdefault(path, []).append(on_change)
+
+        def _remove() -> None:
+            callbacks = handler.targets.get(path, [])
+            if on_change in callbacks:
+                callbacks.remove(on_change)
+            if not callbacks:
+                handler.targets.pop(path, None)
+            if not handler.targets and self._dirs.get(directory, (None, None))[1] is handler:
+                scheduled, _ = self._dirs.pop(directory)
+                self._op(self._unschedule, scheduled)
+                if not self._dirs:
+                    self._op(self._stop)
+        return _remove
+
+def async_watch_file(hass: HomeAssistant, source: FileSource, on_change: Callable[[], None]) -> Callable[[], None]:
+    """Call on_change (in the loop) when the file is closed after writing or atomically replaced.
+
+    Set up in the background (the directory check is I/O); the returned callback stops
+    the watch whether or not setup has finished.
+    """
+    path = os.path.abspath(source.path)
+    unsub: Optional[Callable[[], None]] = None
+    removed = False
+
+    async def _setup() -> None:
+        nonlocal unsub
+        inotify = Observer is not None and await hass.async_add_executor_job(os.path.isdir, os.path.dirname(path))
+        if removed:
+            return
+        if inotify:
+            watcher = hass.data.get(DATA_WATCHER)
+            if watcher is None:
+                watcher = hass.data[DATA_WATCHER] = _Watcher(hass)
+            _LOGGER.debug("SnapCam: watching %s (inotify)", path)
+            unsub = watcher.add(path, on_change)
+        else:
+            unsub = _async_poll_file(hass, source, path, on_change)
+
+    def _remove() -> None:
+        nonlocal removed
+        removed = True
+        if unsub is not None:
+            unsub()
+
+    hass.async_create_task(_setup())
+    return _remove
+
+def _async_poll_file(hass: HomeAssistant, source: FileSource, path: str, on_change: Callable[[], None]) -> Callable[[], None]:
+    polling, seen = False, (source._sig if source._sig is not None else _UNSET)
+
+    async def _poll(_now) -> None:
+        nonlocal polling, seen
+        if polling:
+            return
+        polling = True
+        try:
+            sig = await hass.async_add_executor_job(source.signature)
+            if sig is not None and sig != seen:
+                fire, seen = seen is not _UNSET, sig
+                if fire:
+                    on_change()
+        finally:
+            polling = False
+    _LOGGER.debug("SnapCam: watching %s (stat polling every %ss)", path, WATCH_POLL_S)
+    return async_track_time_interval(hass, _poll, timedelta(seconds=WATCH_POLL_S))
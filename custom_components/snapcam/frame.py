@@ -0,0 +1,52 @@
+from __future__ import annotations
+from typing import Optional
+from datetime import datetime
+
+from .image import fingerprint, image_size, sniff_content_type
+
+class Frame:
+    """Immutable snapshot shared by reference (store, _last, history, caches, streams).
+
+    The encoded bytes are held exactly once; fingerprint, type and dimensions are computed
+    on first use and remembered.
+    """
+
+    __slots__ = ("data", "source", "ts", "_digest", "_dims", "_type")
+
+    def __init__(self, data: bytes, source: Optional[str] = None, ts: Optional[datetime] = None) -> None:
+        object.__setattr__(self, "data", data)
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "ts", ts)
+        object.__setattr__(self, "_digest", None)
+        object.__setattr__(self, "_dims", None)
+        object.__setattr__(self, "_type", None)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("Frame is immutable")
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    @property
+    def digest(self) -> tuple[int, int]:
+        if self._digest is None:
+            object.__setattr__(self, "_digest", fingerprint(self.data))
+        return self._digest
+
+    @property
+    def content_type(self) -> str:
+        """MIME type sniffed from the magic bytes."""
+        if self._type is None:
+            object.__setattr__(self, "_type", sniff_content_type(self.data))
+        return self._type
+
+    @property
+    def dimensions(self) -> Optional[tuple[int, int]]:
+        """(width, height) from the image header; blocking decode of the header only."""
+        if self._dims is None:
+            object.__setattr__(self, "_dims", image_size(self.data) or ())
+        return self._dims or None
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from typing import Optional
+from collections import OrderedDict
+import asyncio, io, logging, math, zlib
+from homeassistant.core import HomeAssistant
+
+try:  # Pillow ships with Home Assistant core, but stay usable without it
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+try:  # optional, only used to vectorize the change score
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .const import RESIZE_CACHE_SIZE, CHANGE_THUMB_SIZE, MOSAIC_TILE_WIDTH
+
+_LOGGER = logging.getLogger(__name__)
+
+_PIL_FORMATS = {"image/jpeg": "JPEG", "image/png": "PNG", "image/webp": "WEBP", "image/gif": "GIF"}
+
+def sniff_content_type(content: bytes) -> str:
+    """MIME type from the magic bytes; unknown data is assumed to be JPEG."""
+    head = content[:12]
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/jpeg"
+
+def fingerprint(content: bytes) -> tuple[int, int]:
+    """Cheap content fingerprint (length, crc32) used to spot byte-identical frames."""
+    return (len(content), zlib.crc32(content))
+
+def image_size(content: bytes) -> Optional[tuple[int, int]]:
+    """(width, height) from the header without decoding pixels; None if unknown."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            return img.size
+    except Exception:
+        return None
+
+def change_score(content: bytes, prev_thumb: bytes | None) -> tuple[Optional[bytes], Optional[float]]:
+    """Grayscale CHANGE_THUMB_SIZE thumbnail of content and its mean absolute difference
+    to prev_thumb in percent (0 = identical scene, 100 = inverted). Runs in the executor."""
+    if Image is None:
+        return None, None
+    with Image.open(io.BytesIO(content)) as img:
+        img.draft("L", CHANGE_THUMB_SIZE)
+        thumb = img.convert("L").resize(CHANGE_THUMB_SIZE).tobytes()
+    if prev_thumb is None or len(prev_thumb) != len(thumb):
+        return thumb, None
+    if np is not None:
+        a = np.frombuffer(thumb, dtype=np.uint8).astype(np.int16)
+        b = np.frombuffer(prev_thumb, dtype=np.uint8).astype(np.int16)
+        total = int(np.abs(a - b).sum())
+    else:
+        total = sum(abs(x - y) for x, y in zip(thumb, prev_thumb))
+    return thumb, total * 100.0 / (255.0 * len(thumb))
+
+def resize_image(content: bytes, width: int | None, height: int | None, quality: int, content_type: str | None = None) -> Optional[bytes]:
+    """Downscale to fit width x height (aspect kept, never upscales) and/or transcode to
+    content_type (None = keep the source format). Returns None when the original already
+    fits. Runs in the executor."""
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(content)) as img:
+        src_w, src_h = img.size
+        w = width or (max(1, round(src_w * height / src_h)) if height else src_w)
+        h = height or (max(1, round(src_h * width / src_w)) if width else src_h)
+        fmt = _PIL_FORMATS.get(content_type) if content_type else img.format
+        if fmt not in ("JPEG", "PNG", "WEBP"):
+            fmt = "JPEG"
+        if w >= src_w and h >= src_h and fmt == img.format:
+            return None
+        img.draft("RGB", (w, h))  # JPEG: let the decoder skip work via DCT scaling
+        img = img.convert("RGBA" if fmt != "JPEG" and img.mode in ("RGBA", "LA", "P") else "RGB")
+        img.thumbnail((w, h))
+        out = io.BytesIO()
+        img.save(out, format=fmt, quality=quality, optimize=False)
+        return out.getvalue()
+
+def compose_mosaic(frames: list[bytes], quality: int) -> Optional[bytes]:
+    """Grid of frames (tiles MOSAIC_TILE_WIDTH wide, aspect of the first frame). Runs in the executor."""
+    if Image is None or not frames:
+        return None
+    images = []
+    for content in frames:
+        try:
+            images.append(Image.open(io.BytesIO(content)))
+        except Exception:
+            continue
+    if not images:
+        return None
+    cols = math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / cols)
+    tile_w = MOSAIC_TILE_WIDTH
+    tile_h = max(1, round(tile_w * images[0].height / images[0].width))
+    sheet = Image.new("RGB", (cols * tile_w, rows * tile_h))
+    for i, img in enumerate(images):
+        img.draft("RGB", (tile_w, tile_h))
+        tile = img.convert("RGB"); tile.thumbnail((tile_w, tile_h))
+        x = (i % cols) * tile_w + (tile_w - tile.width) // 2
+        y = (i // cols) * tile_h + (tile_h - tile.height) // 2
+        sheet.paste(tile, (x, y))
+        img.close()
+    out = io.BytesIO()
+    sheet.save(out, format="JPEG", quality=quality)
+    return out.getvalue()
+
+class ResizeCache:
+    """Bounded LRU of resized / transcoded frames keyed by (generation, role, index, width, height, quality, type).
+
+    Concurrent misses for one key share a single executor resize.
+    """
+
+    def __init__(self, maxsize: int = RESIZE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._inflight.clear()  # keys of older frames are never asked for again
+
+    async def async_get(self, hass: HomeAssistant, key: tuple, content: bytes, width: int | None, height: int | None, quality: int,
+                        content_type: str | None = None) -> bytes:
+        hit = self._items.get(key)
+        if hit is not None:
+            self._items.move_to_end(key)
+            return hit
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = hass.async_create_task(self._resize(hass, key, content, width, height, quality, content_type))
+        return await asyncio.shield(task)
+
+    async def _resize(self, hass: HomeAssistant, key: tuple, content: bytes, width: int | None, height: int | None, quality: int,
+                      content_type: str | None) -> bytes:
+        try:
+            resized = await hass.async_add_executor_job(resize_image, content, width, height, quality, content_type)
+        except Exception as err:
+            _LOGGER.debug("SnapCam: resize to %sx%s failed: %s", width, height, err)
+            resized = None
+        finally:
+            current = self._inflight.pop(key, None)
+        result = resized or content  # not smaller / not decodable -> serve original
+        if current is None:  # cleared meanwhile: stale frame, do not cache
+            return result
+        self._items[key] = result
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return result
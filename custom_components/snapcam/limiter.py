@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import AsyncIterator, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio, logging, time
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_LIMITER, DEFAULT_FETCH_CONCURRENCY, SOURCE_BURST
+
+_LOGGER = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Per-source rate limit; tokens may go negative, which queues callers in order."""
+
+    __slots__ = ("rate", "capacity", "tokens", "stamp")
+
+    def __init__(self, rate: float, capacity: float = SOURCE_BURST) -> None:
+        self.rate, self.capacity = rate, capacity
+        self.tokens, self.stamp = capacity, time.monotonic()
+
+    def reserve(self, now: float) -> float:
+        """Take one token; returns how long the caller must wait for it."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class FetchLimiter:
+    """Hass-wide cap on concurrent source fetches plus per-source token buckets.
+
+    The global limit is the largest value any entry asked for; slots are handed
+    over FIFO so a freed slot never goes to a newcomer ahead of a waiting fetch.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.limit = DEFAULT_FETCH_CONCURRENCY
+        self.active = 0
+        self._wanted: dict[str, int] = {}
+        self._waiters: deque[asyncio.Future] = deque()
+        self._buckets: dict[tuple, TokenBucket] = {}
+        self.queued = 0      # fetches that had to wait for a slot
+        self.max_queue = 0
+        self.throttled = 0   # fetches delayed by a source's rate limit
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for f in self._waiters if not f.done())
+
+    def register(self, entry_id: str, limit: int | None) -> None:
+        self._wanted[entry_id] = max(1, int(limit or DEFAULT_FETCH_CONCURRENCY))
+        self._resize()
+
+    def unregister(self, entry_id: str) -> None:
+        self._wanted.pop(entry_id, None)
+        self._resize()
+
+    def _resize(self) -> None:
+        self.limit = max(self._wanted.values(), default=DEFAULT_FETCH_CONCURRENCY)
+        while self.active < self.limit and self._handoff():
+            self.active += 1
+
+    def _handoff(self) -> bool:
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return True
+        return False
+
+    async def _acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1; return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.queued += 1
+        self.max_queue = max(self.max_queue, self.queue_depth)
+        try:
+            await fut  # slot is handed over with active unchanged
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        if self.active > self.limit or not self._handoff():  # over a lowered limit: shrink first
+            self.active -= 1
+
+    async def _throttle(self, key: tuple, per_minute: float) -> None:
+        bucket = self._buckets.get(key)
+        rate = per_minute / 60.0
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate)
+        bucket.rate = rate  # last configured rate for this source wins
+        delay = bucket.reserve(time.monotonic())
+        if delay > 0:
+            self.throttled += 1
+            _LOGGER.debug("SnapCam: %s rate limited, waiting %.2fs", key, delay)
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self, key: tuple, per_minute: Optional[float] = None) -> AsyncIterator[None]:
+        if per_minute:
+            await self._throttle(key, per_minute)
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def as_dict(self) -> dict:
+        return {"limit": self.limit, "active": self.active, "queue_depth": self.queue_depth,
+                "max_queue": self.max_queue, "queued": self.queued, "throttled": self.throttled}
+
+def async_get_limiter(hass: HomeAssistant) -> FetchLimiter:
+    limiter = hass.data.get(DATA_LIMITER)
+    if limiter is None:
+        limiter = hass.data[DATA_LIMITER] = FetchLimiter(hass)
+    return limiter
@@ -0,0 +1,106 @@
+from __future__ import annotations
+from typing import Any, Optional
+from bisect import bisect_left
+
+from .const import LATENCY_BUCKETS_MS
+
+class Histogram:
+    """Fixed-bucket latency histogram (ms); O(log buckets) per sample, constant memory."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # last bucket = overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile q (overflow reports max)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else round(self.max, 1)
+        return round(self.max, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else None,
+            "p50_ms": self.quantile(0.5), "p90_ms": self.quantile(0.9), "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 1),
+            "buckets_ms": dict(zip([*map(str, LATENCY_BUCKETS_MS), "inf"], self.counts)),
+        }
+
+class FetchStats:
+    __slots__ = ("matches", "fetches", "failures", "bytes", "latency")
+
+    def __init__(self) -> None:
+        self.matches = 0
+        self.fetches = 0
+        self.failures = 0
+        self.bytes = 0
+        self.latency = Histogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"trigger_matches": self.matches, "fetches": self.fetches, "failures": self.failures,
+                "bytes_fetched": self.bytes, "fetch": self.latency.as_dict()}
+
+class SnapMetrics:
+    """Per-entry counters and histograms, keyed by pair label and by source kind."""
+
+    def __init__(self) -> None:
+        self.pairs: dict[str, FetchStats] = {}
+        self.kinds: dict[str, FetchStats] = {}
+        self.state_write = Histogram()
+
+    def _stats(self, label: str, kind: str) -> tuple[FetchStats, FetchStats]:
+        pair = self.pairs.get(label)
+        if pair is None:
+            pair = self.pairs[label] = FetchStats()
+        by_kind = self.kinds.get(kind)
+        if by_kind is None:
+            by_kind = self.kinds[kind] = FetchStats()
+        return pair, by_kind
+
+    def match(self, label: str, kind: str) -> None:
+        for s in self._stats(label, kind):
+            s.matches += 1
+
+    def fetch(self, label: str, kind: str, ms: float, size: int | None) -> None:
+        for s in self._stats(label, kind):
+            s.fetches += 1
+            s.latency.record(ms)
+            if size is None:
+                s.failures += 1
+            else:
+                s.bytes += size
+
+    @property
+    def failures(self) -> int:
+        return sum(s.failures for s in self.kinds.values())
+
+    def fetch_latency(self) -> Histogram:
+        merged = Histogram()
+        for s in self.kinds.values():
+            h = s.latency
+            merged.counts = [a + b for a, b in zip(merged.counts, h.counts)]
+            merged.count += h.count; merged.total += h.total; merged.max = max(merged.max, h.max)
+        return merged
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "by_kind": {k: s.as_dict() for k, s in self.kinds.items()},
+            "by_pair": {k: s.as_dict() for k, s in self.pairs.items()},
+            "state_write": self.state_write.as_dict(),
+        }
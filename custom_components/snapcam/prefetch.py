@@ -0,0 +1,140 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, Optional
+import logging, random, time
+from homeassistant.core import HomeAssistant, Event, State, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .frame import Frame
+from .store import SnapHistory
+
+_LOGGER = logging.getLogger(__name__)
+
+def _is_armed(state: State | None) -> bool:
+    if state is None:
+        return False
+    value = state.state.lower()
+    return value in ("on", "home", "open") or value.startswith("armed")
+
+class Prefetcher:
+    """Keeps a recent frame of one source warm so a trigger can commit it at once.
+
+    Polls every interval_s, stretched to twice the last fetch time for slow sources,
+    optionally only while the `armed` entity is on / home / open / armed_*. A warm
+    frame older than two polling periods is not handed out.
+
+    With a `ring`, every new sample is also kept there as pre-roll; `wanted` (if given)
+    is checked per tick and skips sampling while it returns False. Samples are Frames
+    stamped at capture time, handed out by reference.
+    """
+
+    def __init__(self, hass: HomeAssistant, load: Callable[[], Awaitable[Optional[bytes]]], interval_s: float,
+                 armed_entity: str | None, log_id: str, ring: SnapHistory | None = None,
+                 wanted: Callable[[], bool] | None = None, source: str | None = None) -> None:
+        self.hass, self._load, self.interval_s, self.armed_entity, self._log_id = hass, load, interval_s, armed_entity, log_id
+        self.ring, self._wanted, self.source = ring, wanted, source
+        self.frame: Optional[Frame] = None
+        self.fetched_at = 0.0  # monotonic
+        self.period_s = interval_s  # effective polling period (adaptive)
+        self.fetches = 0
+        self.hits = 0
+        self._active = False
+        self._polling = False
+        self._unsub_timer = None
+        self._unsub_state = None
+
+    @callback
+    def start(self) -> None:
+        if self.armed_entity:
+            self._unsub_state = async_track_state_change_event(self.hass, [self.armed_entity], self._armed_cb)
+            if not _is_armed(self.hass.states.get(self.armed_entity)):
+                return
+        self._activate(random.uniform(0, self.interval_s))  # spread sources after startup
+
+    @callback
+    def stop(self) -> None:
+        self._deactivate()
+        if self._unsub_state is not None:
+            self._unsub_state(); self._unsub_state = None
+        if self.ring is not None:
+            self.ring.release()
+
+    @callback
+    def put(self, content: bytes) -> None:
+        if self.frame is None or content is not self.frame.data:
+            self.frame = Frame(content, self.source, dt_util.now())
+            if self.ring is not None:
+                self.ring.append(self.frame)
+        self.fetched_at = time.monotonic()
+
+    @callback
+    def pick(self, lookback_s: float, mode: str) -> Optional[Frame]:
+        """Pre-roll frame sampled within lookback_s: the earliest, or the largest ("best")."""
+        if self.ring is None:
+            return None
+        since = dt_util.now().timestamp() - lookback_s
+        frames = [f for f in self.ring.slots if f.ts.timestamp() >= since]
+        if not frames:
+            return None
+        self.hits += 1
+        return max(frames, key=len) if mode == "best" else frames[0]
+
+    @callback
+    def take(self) -> Optional[Frame]:
+        if self.frame is None or time.monotonic() - self.fetched_at > 2 * self.period_s:
+            return None
+        self.hits += 1
+        return self.frame
+
+    @callback
+    def _activate(self, delay: float) -> None:
+        self._active = True
+        if self._unsub_timer is None and not self._polling:
+            self._unsub_timer = async_call_later(self.hass, delay, self._tick)
+
+    @callback
+    def _deactivate(self) -> None:
+        self._active = False
+        self.frame = None
+        if self.ring is not None:
+            self.ring.clear()
+        if self._unsub_timer is not None:
+            self._unsub_timer(); self._unsub_timer = None
+
+    @callback
+    def _armed_cb(self, event: Event) -> None:
+        if _is_armed(event.data.get("new_state")):
+            if not self._active:
+                _LOGGER.debug("SnapCam[%s]: %s armed -> prefetching", self._log_id, self.armed_entity)
+                self._activate(0)
+        elif self._active:
+            _LOGGER.debug("SnapCam[%s]: %s disarmed -> prefetch paused", self._log_id, self.armed_entity)
+            self._deactivate()
+
+    @callback
+    def _tick(self, _now) -> None:
+        self._unsub_timer = None
+        self.hass.async_create_task(self._async_poll())
+
+    async def _async_poll(self) -> None:
+        if self._wanted is not None and not self._wanted():
+            if self._active:  # nobody watching: idle, but keep checking
+                self._unsub_timer = async_call_later(self.hass, self.period_s, self._tick)
+            return
+        self._polling = True
+        t0 = time.monotonic()
+        try:
+            content = await self._load()
+        except Exception as err:
+            _LOGGER.debug("SnapCam[%s]: prefetch failed: %s", self._log_id, err)
+            content = None
+        finally:
+            self._polling = False
+        took = time.monotonic() - t0
+        self.fetches += 1
+        if not self._active:
+            return
+        if content is not None:
+            self.put(content)
+        self.period_s = max(self.interval_s, 2 * took)
+        self._unsub_timer = async_call_later(self.hass, self.period_s, self._tick)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import asyncio, logging, time
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+class SnapScheduler:
+    """Per-entry snapshot gate: cooldown reserved at trigger time, one fetch in flight.
+
+    Triggers arriving while a snapshot of the same source (per `key`) runs are coalesced
+    onto it; triggers for another source are queued (one per source) and re-checked
+    when it ends. Triggers inside the cooldown window are skipped. A failed snapshot
+    hands its cooldown slot back. Manual requests bypass the cooldown, share an
+    in-flight fetch of the same source and otherwise run right after it.
+    """
+
+    def __init__(self, hass: HomeAssistant, snapshot: Callable[[Any], Awaitable[bool]], cooldown_s: float, log_id: str,
+                 key: Optional[Callable[[Any], Hashable]] = None) -> None:
+        self.hass, self._snapshot, self.cooldown_s, self._log_id = hass, snapshot, cooldown_s, log_id
+        self._key = key or (lambda job: job)
+        self._inflight: Optional[asyncio.Task] = None
+        self._inflight_key: Hashable = None
+        self._queued: dict[Hashable, Any] = {}  # key -> latest trigger waiting for the in-flight one
+        self._next_ok = 0.0  # monotonic time the cooldown ends
+        self.started = 0
+        self.coalesced = 0
+        self.skipped = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._inflight is not None
+
+    def cooldown_remaining(self) -> float:
+        return max(0.0, self._next_ok - time.monotonic())
+
+    @callback
+    def async_trigger(self, pair: Any) -> None:
+        """Trigger path (cooldown applies)."""
+        if self._inflight is not None:
+            key = self._key(pair)
+            if key != self._inflight_key and key not in self._queued:
+                self._queued[key] = pair
+                _LOGGER.debug("SnapCam[%s]: other source in flight -> queued", self._log_id); return
+            self.coalesced += 1
+            _LOGGER.debug("SnapCam[%s]: snapshot in flight -> coalesced", self._log_id); return
+        now = time.monotonic()
+        if now < self._next_ok:
+            self.skipped += 1
+            _LOGGER.debug("SnapCam[%s]: cooldown active (%.1fs remaining) -> skip", self._log_id, self._next_ok - now); return
+        self._start(pair, now)
+
+    async def async_request(self, pair: Any) -> None:
+        """Manual path (service, button, startup): bypasses the cooldown but shares an in-flight fetch."""
+        key = self._key(pair)
+        while (task := self._inflight) is not None and self._inflight_key != key:
+            await asyncio.wait((task,))  # another source: queue behind it
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._start(pair, time.monotonic())
+        await asyncio.shield(task)
+
+    def _start(self, pair: Any, now: float) -> asyncio.Task:
+        prev_next_ok, self._next_ok = self._next_ok, now + self.cooldown_s
+        self.started += 1
+        self._inflight_key = self._key(pair)
+        task = self._inflight = self.hass.async_create_task(self._run(pair, prev_next_ok))
+        return task
+
+    async def _run(self, pair: Any, prev_next_ok: float) -> None:
+        try:
+            if not await self._snapshot(pair):
+                self._next_ok = prev_next_ok
+        finally:
+            self._inflight = None
+            queued, self._queued = self._queued, {}
+            for pair in queued.values():
+                self.async_trigger(pair)
@@ -6,7 +6,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import EntityCategory
-from .const import DOMAIN, DATA_STORES
+from .const import DOMAIN, DATA_STORES, DATA_LIMITER
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     store = hass.data.get(DATA_STORES, {}).get(entry.entry_id)
@@ -15,17 +15,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     async_add_entities([
         SnapCamLastSourceSensor(hass, entry, store),
         SnapCamLastTriggeredSensor(hass, entry, store),
+        SnapCamFetchLatencySensor(hass, entry, store),
+        SnapCamFetchFailuresSensor(hass, entry, store),
     ])
 
 class SnapCamLastSourceSensor(SensorEntity):
     _attr_has_entity_name = False
     _attr_name = "SnapCam Last Source"
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False  # pushed by the store on every snapshot
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, store) -> None:
         self.hass, self.entry, self.store = hass, entry, store
         self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_last_source"
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.store.async_add_listener(self.async_write_ha_state))
+
     @property
     def name(self) -> str: return "SnapCam Last Source"
     @property
@@ -39,11 +46,16 @@ class SnapCamLastTriggeredSensor(SensorEntity):
     _attr_name = "SnapCam Last Triggered"
     _attr_device_class = "timestamp"
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False  # pushed by the store on every snapshot
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, store) -> None:
         self.hass, self.entry, self.store = hass, entry, store
         self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_last_triggered"
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.store.async_add_listener(self.async_write_ha_state))
+
     @property
     def name(self) -> str: return "SnapCam Last Triggered"
     @property
@@ -52,3 +64,63 @@ class SnapCamLastTriggeredSensor(SensorEntity):
     @property
     def native_value(self):
         return getattr(self.store, "last_update_ts", None)  # tz-aware datetime
+
+class SnapCamFetchLatencySensor(SensorEntity):
+    _attr_has_entity_name = False
+    _attr_name = "SnapCam Fetch Latency"
+    _attr_native_unit_of_measurement = "ms"
+    _attr_state_class = "measurement"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, store) -> None:
+        self.hass, self.entry, self.store = hass, entry, store
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_fetch_latency"
+
+    @property
+    def name(self) -> str: return "SnapCam Fetch Latency"
+    @property
+    def device_info(self) -> dict[str, Any]:
+        return {"identifiers": {(DOMAIN, self.entry.entry_id)}, "name": "SnapCam", "manufacturer": "Custom", "model": "Virtual Snapshot Camera"}
+    @property
+    def native_value(self) -> float | None:
+        return self.store.metrics.fetch_latency().quantile(0.9)  # p90 over all pairs
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        m = self.store.metrics
+        attrs = {f"{kind}_p50_ms": s.latency.quantile(0.5) for kind, s in m.kinds.items()}
+        attrs.update({f"{kind}_p90_ms": s.latency.quantile(0.9) for kind, s in m.kinds.items()})
+        attrs["state_write_p90_ms"] = m.state_write.quantile(0.9)
+        limiter = self.hass.data.get(DATA_LIMITER)
+        if limiter is not None:
+            attrs["fetch_queue_depth"] = limiter.queue_depth
+            attrs["fetch_queue_max"] = limiter.max_queue
+            attrs["fetches_throttled"] = limiter.throttled
+        return attrs
+
+class SnapCamFetchFailuresSensor(SensorEntity):
+    _attr_has_entity_name = False
+    _attr_name = "SnapCam Fetch Failures"
+    _attr_state_class = "total_increasing"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, store) -> None:
+        self.hass, self.entry, self.store = hass, entry, store
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_fetch_failures"
+
+    @property
+    def name(self) -> str: return "SnapCam Fetch Failures"
+    @property
+    def device_info(self) -> dict[str, Any]:
+        return {"identifiers": {(DOMAIN, self.entry.entry_id)}, "name": "SnapCam", "manufacturer": "Custom", "model": "Virtual Snapshot Camera"}
+    @property
+    def native_value(self) -> int: return self.store.metrics.failures
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        m, sched = self.store.metrics, self.store.scheduler
+        return {
+            "trigger_matches": sum(s.matches for s in m.kinds.values()),
+            "cooldown_skips": sched.skipped if sched else 0,
+            "coalesced": sched.coalesced if sched else 0,
+            "bytes_fetched": sum(s.bytes for s in m.kinds.values()),
+            "failures_by_kind": {kind: s.failures for kind, s in m.kinds.items()},
+        }
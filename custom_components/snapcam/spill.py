@@ -0,0 +1,211 @@
+from __future__ import annotations
+from typing import Any, Optional
+import asyncio, json, logging, mmap, os, threading
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .frame import Frame
+from .const import DATA_SPILL, SPILL_DIR, SPILL_DEBOUNCE_S, SPILL_COMPACT_FACTOR, SPILL_RETRY_MAX_S
+
+_LOGGER = logging.getLogger(__name__)
+_SEGMENT = "frames.seg"
+_INDEX = "index.json"
+
+class SnapSpill:
+    """Opt-in on-disk copy of each entry's current/last frame.
+
+    Frames are appended to one segment file; a small JSON index maps entry_id to
+    (offset, length). Writes are debounced and batched, the segment is compacted when
+    mostly dead, and reads slice an mmap of the segment so startup touches only the
+    frames it needs.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.dir = hass.config.path(SPILL_DIR)
+        self._index: Optional[dict[str, dict[str, Any]]] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._dirty: dict[str, Any] = {}  # entry_id -> SnapStore
+        self._written: dict[str, int] = {}  # entry_id -> store generation on disk
+        self._on_disk: dict[str, Frame] = {}  # entry_id -> frame stored as "current"
+        self._flush_lock = asyncio.Lock()  # batches may refer to spans of the previous one
+        self._unsub_flush = None
+        self._retry_s = SPILL_DEBOUNCE_S  # next retry delay after a failed write
+        self._stopping = False
+        self._lock = threading.Lock()  # executor jobs share the index and the mmap
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_on_stop)
+
+    # ---- blocking helpers (executor) ----
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        if self._index is None:
+            try:
+                with open(self._path(_INDEX), encoding="utf-8") as fh:
+                    self._index = json.load(fh).get("entries", {})
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        tmp = self._path(_INDEX + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "entries": self._index}, fh)
+        os.replace(tmp, self._path(_INDEX))
+
+    def _close_mmap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close(); self._mmap = None
+
+    def _slice(self, span: Optional[list[int]]) -> Optional[bytes]:
+        if not span:
+            return None
+        off, size = span
+        if self._mmap is None or self._mmap.size() < off + size:
+            self._close_mmap()
+            with open(self._path(_SEGMENT), "rb") as fh:
+                self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[off:off + size] if self._mmap.size() >= off + size else None
+
+    def read(self, entry_id: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            return self._read(entry_id)
+
+    def _read(self, entry_id: str) -> Optional[dict[str, Any]]:
+        rec = self._load_index().get(entry_id)
+        if not rec:
+            return None
+        try:
+            return {"current": self._slice(rec.get("current")), "last": self._slice(rec.get("last")),
+                    "source": rec.get("source"), "ts": rec.get("ts")}
+        except (OSError, ValueError) as err:
+            _LOGGER.debug("SnapCam[%s]: spill read failed: %s", entry_id, err)
+            return None
+
+    def write(self, batch: dict[str, dict[str, Any]]) -> None:
+        with self._lock:
+            self._write(batch)
+
+    def _write(self, batch: dict[str, dict[str, Any]]) -> None:
+        """Append a batch; a role given as a role name ("current") reuses that span of the
+        entry's previous record instead of writing the bytes again."""
+        index = self._load_index()
+        os.makedirs(self.dir, exist_ok=True)
+        records = {}
+        with open(self._path(_SEGMENT), "ab") as fh:
+            off = fh.tell()
+            for entry_id, rec in batch.items():
+                old, new = index.get(entry_id) or {}, {"source": rec["source"], "ts": rec["ts"]}
+                for role in ("current", "last"):
+                    content = rec.get(role)
+                    if isinstance(content, str):
+                        if old.get(content):
+                            new[role] = old[content]
+                    elif content:
+                        fh.write(content); new[role] = [off, len(content)]; off += len(content)
+                records[entry_id] = new
+            fh.flush(); os.fsync(fh.fileno())
+        index.update(records)  # only once the bytes are on disk
+        self._maybe_compact(off)
+        self._save_index()
+
+    def forget(self, entry_id: str) -> None:
+        with self._lock:
+            if self._load_index().pop(entry_id, None) is not None and os.path.isdir(self.dir):
+                self._save_index()
+
+    def _maybe_compact(self, size: int) -> None:
+        live = sum(span[1] for rec in self._index.values() for span in (rec.get("current"), rec.get("last")) if span)
+        if size < 1024 * 1024 or size <= SPILL_COMPACT_FACTOR * live:
+            return
+        tmp = self._path(_SEGMENT + ".tmp")
+        compacted: dict[str, dict[str, Any]] = {}
+        with open(tmp, "wb") as out:
+            off = 0
+            for entry_id, rec in self._index.items():
+                new = {"source": rec.get("source"), "ts": rec.get("ts")}
+                for role in ("current", "last"):
+                    content = self._slice(rec.get(role))
+                    if content:
+                        out.write(content); new[role] = [off, len(content)]; off += len(content)
+                compacted[entry_id] = new
+            out.flush(); os.fsync(out.fileno())
+        self._close_mmap()
+        os.replace(tmp, self._path(_SEGMENT))
+        self._index = compacted
+        _LOGGER.debug("SnapCam: spill segment compacted %d -> %d bytes", size, off)
+
+    # ---- loop side ----
+    async def async_restore(self, entry_id: str, store) -> bool:
+        rec = await self.hass.async_add_executor_job(self.read, entry_id)
+        if not rec or not rec.get("current") or store.current is not None:
+            return False
+        ts = dt_util.parse_datetime(rec["ts"]) if rec.get("ts") else None
+        store.current = Frame(rec["current"], rec.get("source"), ts)
+        store.last = Frame(rec["last"]) if rec.get("last") else None
+        store.last_source_camera = rec.get("source")
+        store.last_update_ts = ts
+        store.generation += 1
+        self._written[entry_id] = store.generation
+        self._on_disk[entry_id] = store.current
+        return True
+
+    @callback
+    def async_schedule(self, entry_id: str, store) -> None:
+        self._dirty[entry_id] = store
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, SPILL_DEBOUNCE_S, self._async_flush_later)
+
+    @callback
+    def _async_flush_later(self, _now) -> None:
+        self._unsub_flush = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, {}
+            batch, done = {}, {}
+            for entry_id, store in dirty.items():
+                if store.current is None or self._written.get(entry_id) == store.generation:
+                    continue
+                ts, last = store.last_update_ts, store.last
+                if last is not None:  # the previous current is usually on disk already
+                    last = "current" if last is self._on_disk.get(entry_id) else last.data
+                batch[entry_id] = {"current": store.current.data, "last": last, "source": store.last_source_camera,
+                                   "ts": ts.isoformat() if ts else None}
+                done[entry_id] = (store.generation, store.current)
+            if not batch:
+                return
+            try:
+                await self.hass.async_add_executor_job(self.write, batch)
+            except OSError as err:
+                _LOGGER.warning("SnapCam: writing snapshot cache failed: %s", err)
+                for entry_id in batch:
+                    self._dirty.setdefault(entry_id, dirty[entry_id])
+                if self._unsub_flush is None and not self._stopping:  # retry on a timer, backing off
+                    self._unsub_flush = async_call_later(self.hass, self._retry_s, self._async_flush_later)
+                    self._retry_s = min(SPILL_RETRY_MAX_S, self._retry_s * 2)
+                return
+            self._retry_s = SPILL_DEBOUNCE_S
+            for entry_id, (gen, frame) in done.items():
+                self._written[entry_id], self._on_disk[entry_id] = gen, frame
+
+    async def async_forget(self, entry_id: str) -> None:
+        self._dirty.pop(entry_id, None); self._written.pop(entry_id, None); self._on_disk.pop(entry_id, None)
+        await self.hass.async_add_executor_job(self.forget, entry_id)
+
+    async def _async_on_stop(self, _event) -> None:
+        self._stopping = True
+        if self._unsub_flush is not None:
+            self._unsub_flush(); self._unsub_flush = None
+        await self.async_flush()
+        await self.hass.async_add_executor_job(self._close_mmap)
+
+def async_get_spill(hass: HomeAssistant) -> SnapSpill:
+    spill = hass.data.get(DATA_SPILL)
+    if spill is None:
+        spill = hass.data[DATA_SPILL] = SnapSpill(hass)
+    return spill
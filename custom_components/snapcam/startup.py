@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import Awaitable, Callable
+import asyncio, logging, random
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState, HomeAssistant, callback
+
+from .const import DATA_STARTUP, STARTUP_CONCURRENCY, STARTUP_JITTER_S
+
+_LOGGER = logging.getLogger(__name__)
+
+class StartupScheduler:
+    """Hass-wide queue for initial snapshots.
+
+    Jobs wait for EVENT_HOMEASSISTANT_STARTED (or run right away when HA is already
+    up, e.g. on reload), then run with a global concurrency limit and random jitter.
+    Entries whose image is requested while queued (a dashboard is showing them) jump
+    the queue.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._pending: dict[str, Callable[[], Awaitable[None]]] = {}  # insertion order = FIFO
+        self._promoted: dict[str, None] = {}
+        self._workers = 0
+        self._started = hass.state is CoreState.running
+        if not self._started:
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, self._async_on_started)
+
+    @callback
+    def async_enqueue(self, entry_id: str, job: Callable[[], Awaitable[None]]) -> None:
+        self._pending[entry_id] = job
+        if self._started:
+            self._spawn()
+
+    @callback
+    def async_cancel(self, entry_id: str) -> None:
+        self._pending.pop(entry_id, None); self._promoted.pop(entry_id, None)
+
+    @callback
+    def async_promote(self, entry_id: str) -> None:
+        if entry_id in self._pending and entry_id not in self._promoted:
+            self._promoted[entry_id] = None
+            _LOGGER.debug("SnapCam[%s]: viewed before initial snapshot -> prioritized", entry_id)
+
+    async def _async_on_started(self, _event) -> None:
+        self._started = True
+        _LOGGER.debug("SnapCam: running %d initial snapshots", len(self._pending))
+        self._spawn()
+
+    def _spawn(self) -> None:
+        while self._workers < min(STARTUP_CONCURRENCY, len(self._pending)):
+            self._workers += 1
+            self.hass.async_create_task(self._worker())
+
+    def _pop(self) -> Callable[[], Awaitable[None]] | None:
+        while self._promoted:
+            entry_id = next(iter(self._promoted)); self._promoted.pop(entry_id)
+            if entry_id in self._pending:
+                return self._pending.pop(entry_id)
+        if self._pending:
+            return self._pending.pop(next(iter(self._pending)))
+        return None
+
+    async def _worker(self) -> None:
+        try:
+            while self._pending:
+                if not self._promoted:
+                    await asyncio.sleep(random.uniform(0, STARTUP_JITTER_S))
+                job = self._pop()
+                if job is None:
+                    break
+                try:
+                    await job()
+                except Exception as err:
+                    _LOGGER.warning("SnapCam: initial snapshot failed: %s", err)
+        finally:
+            self._workers -= 1
+
+def async_get_startup(hass: HomeAssistant) -> StartupScheduler:
+    startup = hass.data.get(DATA_STARTUP)
+    if startup is None:
+        startup = hass.data[DATA_STARTUP] = StartupScheduler(hass)
+    return startup
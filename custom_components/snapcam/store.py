@@ -0,0 +1,140 @@
+from __future__ import annotations
+from typing import Callable, Optional
+from collections import deque
+import logging
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_HISTORY_BUDGET, HISTORY_GLOBAL_MAX_BYTES, DATA_PREROLL_BUDGET, PREROLL_GLOBAL_MAX_BYTES
+from .frame import Frame
+from .image import ResizeCache
+from .metrics import SnapMetrics
+from .stream import FrameSignal
+
+_LOGGER = logging.getLogger(__name__)
+
+class HistoryBudget:
+    """Hass-wide byte ceiling across a family of rings (history, pre-roll) of all entries."""
+
+    def __init__(self, max_bytes: int = HISTORY_GLOBAL_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.rings: set[SnapHistory] = set()
+
+    @property
+    def used(self) -> int:
+        return sum(r.nbytes for r in self.rings)
+
+    def enforce(self) -> None:
+        used = self.used
+        while used > self.max_bytes:
+            victim = min((r for r in self.rings if r.slots), key=lambda r: r.slots[0].ts, default=None)
+            if victim is None:
+                return
+            used -= victim.drop_oldest()
+
+class SnapHistory:
+    """RAM ring of the last N snapshots, bounded by count and bytes (oldest first)."""
+
+    def __init__(self, depth: int, max_bytes: int, budget: HistoryBudget | None = None) -> None:
+        self.depth, self.max_bytes, self.budget = depth, max_bytes, budget
+        self.slots: deque[Frame] = deque()
+        self.nbytes = 0
+        if budget is not None:
+            budget.rings.add(self)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def append(self, frame: Frame) -> None:
+        if self.depth <= 0 or frame.nbytes > self.max_bytes:
+            return
+        self.slots.append(frame)
+        self.nbytes += frame.nbytes
+        while len(self.slots) > self.depth or self.nbytes > self.max_bytes:
+            self.drop_oldest()
+        if self.budget is not None:
+            self.budget.enforce()
+
+    def replace_newest(self, frame: Frame) -> None:
+        if self.slots:
+            self.nbytes -= self.slots.pop().nbytes
+        self.append(frame)
+
+    def drop_oldest(self) -> int:
+        frame = self.slots.popleft()
+        self.nbytes -= frame.nbytes
+        return frame.nbytes
+
+    def get(self, k: int) -> Optional[Frame]:
+        """Frame k, 0 = newest; returned by reference, never copied."""
+        if 0 <= k < len(self.slots):
+            return self.slots[-1 - k]
+        return None
+
+    def clear(self) -> None:
+        self.slots.clear(); self.nbytes = 0
+
+    def release(self) -> None:
+        self.clear()
+        if self.budget is not None:
+            self.budget.rings.discard(self)
+
+def async_get_history_budget(hass: HomeAssistant) -> HistoryBudget:
+    budget = hass.data.get(DATA_HISTORY_BUDGET)
+    if budget is None:
+        budget = hass.data[DATA_HISTORY_BUDGET] = HistoryBudget()
+    return budget
+
+def async_get_preroll_budget(hass: HomeAssistant) -> HistoryBudget:
+    budget = hass.data.get(DATA_PREROLL_BUDGET)
+    if budget is None:
+        budget = hass.data[DATA_PREROLL_BUDGET] = HistoryBudget(PREROLL_GLOBAL_MAX_BYTES)
+    return budget
+
+class SnapStore:
+    """Per-entry snapshot state shared by all entities of the entry.
+
+    Observable: entities register a listener once and are called together, in the
+    same loop iteration, whenever a snapshot is committed.
+    """
+
+    def __init__(self, history: SnapHistory | None = None) -> None:
+        self.current: Optional[Frame] = None
+        self.last: Optional[Frame] = None
+        self.last_update_ts = None  # tz-aware datetime
+        self.last_source_camera: Optional[str] = None
+        self.trigger_pulse_off = None
+        self.generation = 0  # bumped on every stored frame
+        self.frames_seen = 0
+        self.duplicates = 0
+        self.current_thumb: Optional[bytes] = None  # grayscale thumbnail for the change gate
+        self.unchanged = 0  # frames rejected by the change gate
+        self.resized = ResizeCache()
+        self.history = history
+        self.scheduler = None  # SnapScheduler, set up by the camera platform
+        self.metrics = SnapMetrics()
+        self.frames = FrameSignal()
+        self.burst: list[Frame] = []  # frames of the last burst capture
+        self.restored = False  # current/last came from the on-disk cache
+        self._listeners: list[Callable[[], None]] = [self.frames.notify]
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        self._listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+        return _remove
+
+    @callback
+    def async_notify(self) -> None:
+        """Fan a committed snapshot out to every listener (cameras, sensors, streams)."""
+        for listener in tuple(self._listeners):
+            try:
+                listener()
+            except Exception:  # one broken entity must not hide the snapshot from the others
+                _LOGGER.exception("SnapCam: store listener failed")
+
+    def release(self) -> None:
+        if self.history is not None:
+            self.history.release()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Optional
+import asyncio, time
+
+from .const import PREROLL_IDLE_S
+
+class FrameSignal:
+    """Wakes every waiting MJPEG viewer of an entry once per stored frame.
+
+    `generation` counts notifications; a viewer passes the value it saw before its
+    last write, so a frame stored while it was still writing is not missed.
+    """
+
+    def __init__(self) -> None:
+        self._waiter: Optional[asyncio.Future] = None
+        self.generation = 0
+        self.viewers = 0
+        self.last_view = 0.0  # monotonic time of the last still-image request
+
+    def touch(self) -> None:
+        self.last_view = time.monotonic()
+
+    def watching(self) -> bool:
+        """Someone has the live view open or fetched a still recently."""
+        return self.viewers > 0 or time.monotonic() - self.last_view < PREROLL_IDLE_S
+
+    def notify(self) -> None:
+        self.generation += 1
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def async_wait(self, timeout: float | None, seen: int | None = None) -> bool:
+        """True on a new frame (or one newer than `seen` already stored), False on timeout (keepalive)."""
+        if seen is not None and seen != self.generation:
+            return True
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+def mjpeg_part_header(content_type: str, size: int) -> bytes:
+    return f"--frameboundary\r\nContent-Type: {content_type}\r\nContent-Length: {size}\r\n\r\n".encode()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import Callable, Hashable
+import logging, math
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_TIMERS, WHEEL_TICK_S, WHEEL_SLOTS
+
+_LOGGER = logging.getLogger(__name__)
+
+class TimerWheel:
+    """Hass-wide hashed timing wheel for short trigger timers (hold, debounce).
+
+    Schedule/cancel are O(1) dict operations keyed by the caller; one loop timer ticks
+    every WHEEL_TICK_S while anything is pending and stops when the wheel is empty.
+    Re-scheduling a key replaces its previous timer.
+    """
+
+    def __init__(self, hass: HomeAssistant, tick_s: float = WHEEL_TICK_S, size: int = WHEEL_SLOTS) -> None:
+        self.hass, self.tick_s, self.size = hass, tick_s, size
+        self._slots: list[dict[Hashable, list]] = [{} for _ in range(size)]  # key -> [rounds, callback]
+        self._where: dict[Hashable, int] = {}
+        self._pos = 0
+        self._next = 0.0
+        self._handle = None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    @callback
+    def schedule(self, key: Hashable, delay_s: float, action: Callable[[], None]) -> None:
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay_s / self.tick_s))
+        if self._handle is not None:  # part of the current tick has already elapsed
+            ticks += 1
+        slot = (self._pos + ticks) % self.size
+        self._slots[slot][key] = [(ticks - 1) // self.size, action]
+        self._where[key] = slot
+        if self._handle is None:
+            self._next = self.hass.loop.time() + self.tick_s
+            self._handle = self.hass.loop.call_at(self._next, self._tick)
+
+    @callback
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    @callback
+    def pending(self, key: Hashable) -> bool:
+        return key in self._where
+
+    @callback
+    def _tick(self) -> None:
+        self._pos = (self._pos + 1) % self.size
+        bucket, due = self._slots[self._pos], []
+        for key, item in bucket.items():
+            if item[0]:
+                item[0] -= 1
+            else:
+                due.append((key, item[1]))
+        for key, _ in due:
+            del bucket[key]; del self._where[key]
+        for key, action in due:
+            try:
+                action()
+            except Exception:  # one bad callback must not stall the wheel
+                _LOGGER.exception("SnapCam: timer %s failed", key)
+        if self._where:
+            self._next += self.tick_s
+            self._handle = self.hass.loop.call_at(max(self._next, self.hass.loop.time()), self._tick)
+        else:
+            self._handle = None
+
+def async_get_timer_wheel(hass: HomeAssistant) -> TimerWheel:
+    wheel = hass.data.get(DATA_TIMERS)
+    if wheel is None:
+        wheel = hass.data[DATA_TIMERS] = TimerWheel(hass)
+    return wheel
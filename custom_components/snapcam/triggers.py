@@ -0,0 +1,199 @@
+from __future__ import annotations
+from typing import Any, Callable, List
+import logging, time
+from homeassistant.core import HomeAssistant, Event, State, callback
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.template import Template, result_as_boolean
+
+from .const import TRIGGER_STATE, TRIGGER_EVENT, TRIGGER_WATCH
+from .files import async_watch_file
+from .timers import async_get_timer_wheel
+
+_LOGGER = logging.getLogger(__name__)
+
+def _noop() -> None:
+    pass
+
+def _norm(value: Any) -> str | None:
+    return None if value is None else str(value).lower()
+
+def _norm_set(value: Any) -> frozenset[str] | None:
+    if value is None or value == "":
+        return None
+    items = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    return frozenset(str(v).strip().lower() for v in items if str(v).strip()) or None
+
+def _compile_template(hass: HomeAssistant, text: str | None, log_id: str) -> Template | None | bool:
+    """Template object (parsed once here), None without condition, False if invalid."""
+    if not text:
+        return None
+    tpl = Template(text, hass)
+    try:
+        tpl.ensure_valid()
+    except TemplateError as err:
+        _LOGGER.warning("SnapCam[%s]: invalid condition %r, pair disabled: %s", log_id, text, err)
+        return False
+    return tpl
+
+def _render(tpl: Template, variables: dict[str, Any], log_id: str) -> bool:
+    try:
+        return result_as_boolean(tpl.async_render(variables, parse_result=False))
+    except TemplateError as err:
+        _LOGGER.debug("SnapCam[%s]: condition failed: %s", log_id, err)
+        return False
+
+class StateCondition:
+    """Compiled state-trigger condition of one pair (value lists, thresholds, attribute, template)."""
+
+    __slots__ = ("attribute", "to", "frm", "above", "below", "template")
+
+    def __init__(self, hass: HomeAssistant, pair: Any, log_id: str) -> None:
+        self.attribute = pair.attribute or None
+        self.above, self.below = pair.above, pair.below
+        self.to = None if self.numeric else _norm_set(pair.state_to)
+        self.frm = _norm_set(pair.state_from)
+        self.template = _compile_template(hass, pair.condition, log_id)
+
+    @property
+    def numeric(self) -> bool:
+        return self.above is not None or self.below is not None
+
+    def value(self, state: State | None) -> str | None:
+        if state is None:
+            return None
+        if self.attribute:
+            return _norm(state.attributes.get(self.attribute))
+        return state.state.lower()
+
+    def _in_range(self, val: str | None) -> bool:
+        try:
+            f = float(val)
+        except (TypeError, ValueError):
+            return False
+        return (self.above is None or f > self.above) and (self.below is None or f < self.below)
+
+    def holds(self, new_val: str | None) -> bool:
+        """True while the new value satisfies the target (used for `for` hold times)."""
+        if self.numeric:
+            return self._in_range(new_val)
+        return self.to is None or new_val in self.to
+
+    def enters(self, old_val: str | None) -> bool:
+        """True if a match from old_val starts a new hold: the target is being entered, or
+        there is no target and every change counts."""
+        return not self.holds(old_val) or (self.to is None and not self.numeric)
+
+    def matches(self, old_val: str | None, new_val: str | None) -> bool:
+        if self.template is False or not self.holds(new_val):
+            return False
+        if self.frm is not None and old_val not in self.frm:
+            return False
+        return not (self.numeric and self._in_range(old_val))  # thresholds fire on crossing only
+
+class TriggerEngine:
+    """Single-dispatch trigger matching for one SnapCam entry.
+
+    Subscribes exactly once per state entity (one state_changed tracker for all of them)
+    and once per event type; matching uses indexes built once at setup:
+      state: entity_id -> [(StateCondition, pair)]
+      event: event_type -> [(frozen event_data items, template, pair)]
+    Templates are parsed here once and only rendered after the cheap checks passed.
+    File pairs with trigger_type "watch" get one file watcher each.
+
+    Per-pair timing runs between a match and on_match: `for` (state must hold),
+    `debounce` (leading edge; further matches are swallowed until quiet) and a
+    sub-minute per-pair cooldown. Timers live on the hass-wide TimerWheel.
+    """
+
+    def __init__(self, hass: HomeAssistant, pairs: List[Any], on_match: Callable[[Any], None], log_id: str) -> None:
+        self.hass, self._on_match, self._log_id = hass, on_match, log_id
+        self._state_index: dict[str, list[tuple[StateCondition, Any]]] = {}
+        self._event_index: dict[str, list[tuple[tuple, Any, Any]]] = {}
+        self._watch: list[Any] = []
+        self._unsubscribers: List[Callable[[], None]] = []
+        self._wheel = async_get_timer_wheel(hass)
+        self._keys = {id(pair): (log_id, n) for n, pair in enumerate(pairs)}
+        self._next_ok: dict[int, float] = {}  # id(pair) -> monotonic time of next allowed firing
+        self.suppressed = 0
+        for pair in pairs:
+            if pair.trigger_type == TRIGGER_STATE and pair.state_entity:
+                cond = StateCondition(hass, pair, log_id)
+                self._state_index.setdefault(pair.state_entity, []).append((cond, pair))
+            elif pair.trigger_type == TRIGGER_EVENT and pair.event_type:
+                flt = tuple((k, tuple(v) if isinstance(v, list) else (v,)) for k, v in (pair.event_data or {}).items())
+                tpl = _compile_template(hass, pair.condition, log_id)
+                self._event_index.setdefault(pair.event_type, []).append((flt, tpl, pair))
+            elif pair.trigger_type == TRIGGER_WATCH and pair.file_source is not None:
+                self._watch.append(pair)
+
+    def subscribe(self) -> None:
+        self.unsubscribe()
+        if self._state_index:
+            entities = list(self._state_index)
+            self._unsubscribers.append(async_track_state_change_event(self.hass, entities, self._state_cb))
+            _LOGGER.debug("SnapCam[%s]: subscribed state %s", self._log_id, entities)
+        for event_type, entries in self._event_index.items():
+            self._unsubscribers.append(self.hass.bus.async_listen(event_type, self._event_cb))
+            _LOGGER.debug("SnapCam[%s]: subscribed event %s (%d filters)", self._log_id, event_type, len(entries))
+        for pair in self._watch:
+            self._unsubscribers.append(async_watch_file(self.hass, pair.file_source, lambda p=pair: self._matched(p)))
+
+    def unsubscribe(self) -> None:
+        for unsub in self._unsubscribers:
+            try: unsub()
+            except Exception: pass
+        self._unsubscribers.clear()
+        for key in self._keys.values():
+            self._wheel.cancel((*key, "for")); self._wheel.cancel((*key, "debounce"))
+
+    @callback
+    def _matched(self, pair: Any) -> None:
+        key = self._keys[id(pair)]
+        if pair.debounce_s and self._wheel.pending((*key, "debounce")):
+            self.suppressed += 1
+            self._wheel.schedule((*key, "debounce"), pair.debounce_s, _noop)  # window extends while flapping
+            return
+        now = time.monotonic()
+        if pair.cooldown_s:
+            if now < self._next_ok.get(id(pair), 0.0):
+                self.suppressed += 1
+                return
+            self._next_ok[id(pair)] = now + pair.cooldown_s
+        if pair.debounce_s:
+            self._wheel.schedule((*key, "debounce"), pair.debounce_s, _noop)
+        self._on_match(pair)
+
+    @callback
+    def _state_cb(self, event: Event) -> None:
+        entries = self._state_index.get(event.data.get("entity_id"))
+        if not entries:
+            return
+        old, new = event.data.get("old_state"), event.data.get("new_state")
+        for cond, pair in entries:
+            old_val, new_val = cond.value(old), cond.value(new)
+            if new_val == old_val:
+                continue
+            if cond.matches(old_val, new_val) and (cond.template is None or _render(
+                    cond.template, {"trigger": {"platform": "state", "entity_id": pair.state_entity, "from_state": old, "to_state": new}}, self._log_id)):
+                _LOGGER.debug("SnapCam[%s]: MATCH %s %s -> %s", self._log_id, pair.state_entity, old_val, new_val)
+                if pair.hold_s:
+                    if not cond.enters(old_val):  # moved within the target: the running hold stands
+                        continue
+                    self._wheel.schedule((*self._keys[id(pair)], "for"), pair.hold_s, lambda p=pair: self._matched(p))
+                else:
+                    self._matched(pair)
+            elif pair.hold_s and not cond.holds(new_val) and self._wheel.cancel((*self._keys[id(pair)], "for")):
+                self.suppressed += 1
+                _LOGGER.debug("SnapCam[%s]: %s left its target before %ss", self._log_id, pair.state_entity, pair.hold_s)
+
+    @callback
+    def _event_cb(self, event: Event) -> None:
+        data = event.data
+        for flt, tpl, pair in self._event_index.get(event.event_type, ()):
+            if tpl is False or not all(data.get(k) in allowed for k, allowed in flt):
+                continue
+            if tpl is not None and not _render(tpl, {"trigger": {"platform": "event", "event": event}}, self._log_id):
+                continue
+            _LOGGER.debug("SnapCam[%s]: event '%s' matched", self._log_id, event.event_type)
+            self._matched(pair)
@@ -0,0 +1,14 @@
+"""Shared fixtures; the `hass` fixture comes from pytest-homeassistant-custom-component."""
+from __future__ import annotations
+import pytest
+
+try:
+    import pytest_homeassistant_custom_component  # noqa: F401
+except ImportError:  # requirements_test.txt not installed: test modules skip themselves
+    pass
+else:
+    pytest_plugins = "pytest_homeassistant_custom_component"
+
+    @pytest.fixture(autouse=True)
+    def auto_enable_custom_integrations(enable_custom_integrations):
+        yield
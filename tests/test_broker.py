@@ -0,0 +1,54 @@
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.snapcam.broker import FetchBroker
+
+def _source(*results):
+    calls, gate = [], asyncio.Event()
+    it = iter(results)
+
+    async def fetch():
+        calls.append(1)
+        await gate.wait()
+        return next(it)
+
+    return fetch, calls, gate
+
+async def test_concurrent_requests_share_one_fetch(hass):
+    broker = FetchBroker(hass, window_s=0)
+    fetch, calls, gate = _source(b"frame")
+    tasks = [asyncio.create_task(broker.async_fetch(("entity", "camera.a"), fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+    assert len(calls) == 1 and all(r is results[0] for r in results)
+    assert broker.fetches == 1 and broker.shared == 2
+
+async def test_window_reuses_then_expires(hass):
+    broker = FetchBroker(hass, window_s=0.05)
+    fetch, calls, gate = _source(b"one", b"two")
+    gate.set()
+    key = ("url", "http://cam/x.jpg")
+    assert await broker.async_fetch(key, fetch) == b"one"
+    assert await broker.async_fetch(key, fetch) == b"one"  # inside the window
+    await asyncio.sleep(0.1)
+    assert await broker.async_fetch(key, fetch) == b"two" and len(calls) == 2
+
+async def test_file_results_are_not_cached(hass):
+    broker = FetchBroker(hass, window_s=60)
+    fetch, calls, gate = _source(b"v1", b"v2")
+    gate.set()
+    key = ("file", "/config/www/snap.jpg")
+    assert await broker.async_fetch(key, fetch) == b"v1"
+    assert await broker.async_fetch(key, fetch) == b"v2" and len(calls) == 2
+
+async def test_failed_fetch_is_not_cached(hass):
+    broker = FetchBroker(hass, window_s=60)
+    fetch, calls, gate = _source(None, b"ok")
+    gate.set()
+    key = ("entity", "camera.a")
+    assert await broker.async_fetch(key, fetch) is None
+    assert await broker.async_fetch(key, fetch) == b"ok"
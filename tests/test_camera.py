@@ -0,0 +1,114 @@
+from __future__ import annotations
+from unittest.mock import AsyncMock
+import io
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.snapcam.camera import SnapCamCamera, SnapCamCameraUnrecordedPairs
+from custom_components.snapcam.const import *
+from custom_components.snapcam.prefetch import Prefetcher
+from custom_components.snapcam.scheduler import SnapScheduler
+from custom_components.snapcam.store import SnapHistory, SnapStore
+
+def _entry(**extra) -> MockConfigEntry:
+    return MockConfigEntry(domain=DOMAIN, data={
+        CONF_CAM_NAME: "Door",
+        CONF_PAIRS: [
+            {KEY_PAIR_CAMERA: "camera.door", KEY_STATE_ENTITY: "binary_sensor.door", KEY_STATE_TO: "on", KEY_PAIR_FOR: 2},
+            {KEY_PAIR_SOURCE_KIND: "url", KEY_PAIR_URL: "http://cam/snap.jpg", KEY_TRIGGER_TYPE: TRIGGER_EVENT, KEY_EVENT_TYPE: "doorbell"},
+        ],
+        **extra,
+    })
+
+async def test_construct(hass):
+    entry = _entry()
+    cam = SnapCamCamera(hass, entry, SnapStore())
+    assert cam.name == "Door" and cam.unique_id == f"{DOMAIN}_{entry.entry_id}"
+    assert cam.content_type == "image/jpeg"
+    pairs = cam.extra_state_attributes["pairs"]
+    assert [p["source_kind"] for p in pairs] == ["entity", "url"]
+    assert pairs[0]["for"] == 2.0 and pairs[1]["event_type"] == "doorbell"
+    assert "pairs" not in cam._unrecorded_attributes
+    cam.store.scheduler = SnapScheduler(hass, cam._do_snapshot, 0.0, entry.entry_id)
+    await cam._commit(b"frame", "camera.door")
+    volatile = set(cam.extra_state_attributes) - {"description", "cooldown_min", "pairs", "role", "last_update", "last_source_camera"}
+    assert volatile and volatile <= cam._unrecorded_attributes
+
+async def test_roles_and_unrecorded_pairs(hass):
+    entry, store = _entry(), SnapStore()
+    last = SnapCamCameraUnrecordedPairs(hass, entry, store, role="last")
+    assert last.name == "Door_last" and last.unique_id.endswith("_last")
+    assert {"pairs", "triggers_skipped", "history"} <= last._unrecorded_attributes
+    assert await last.async_camera_image() is not None  # placeholder before any snapshot
+
+async def test_job_key_groups_same_source(hass):
+    cam = SnapCamCamera(hass, _entry(), SnapStore())
+    a, b = cam._pairs
+    assert cam._job_key(a) == ("entity", "camera.door") != cam._job_key(b)
+    assert cam._job_key((a, b)) == ("burst",)
+
+@pytest.mark.parametrize("dedup", [True, False])
+async def test_warm_triggers_keep_last_and_history(hass, dedup):
+    store = SnapStore(SnapHistory(10, 1 << 20))
+    cam = SnapCamCamera(hass, _entry(**{CONF_DROP_DUPLICATES: dedup}), store)
+    pair = cam._pairs[0]
+    warm = cam._warm[cam._source_key(pair)] = Prefetcher(hass, AsyncMock(), 5.0, None, "test")
+    warm.put(b"warm")
+    cam._load_bytes = AsyncMock(side_effect=[b"live1", b"live2"])
+
+    assert await cam._do_snapshot(pair)  # warm frame now, live replacement right after
+    await hass.async_block_till_done()
+    assert store.current.data == b"live1" and store.last is None
+    assert [f.data for f in store.history.slots] == [b"live1"]
+
+    assert await cam._do_snapshot(pair)  # warm frame is live1 again
+    await hass.async_block_till_done()
+    assert store.current.data == b"live2" and store.last.data == b"live1"
+    assert len(store.history) == 2 and store.history.get(0) is store.current
+
+async def test_preroll_frame_keeps_capture_time(hass):
+    store = SnapStore(SnapHistory(10, 1 << 20))
+    entry = _entry()
+    cam = SnapCamCamera(hass, entry, store)
+    pair = cam._pairs[0]
+    pair.preroll_s = 10.0
+    ring = SnapHistory(5, 1 << 20)
+    warm = cam._warm[cam._source_key(pair)] = Prefetcher(hass, AsyncMock(), 1.0, None, "test", ring, source="camera.door")
+    warm.put(b"before")
+    sampled = ring.get(0)
+    cam._load_bytes = AsyncMock(return_value=b"live")
+    assert await cam._do_snapshot(pair)
+    assert store.current is sampled  # shared by reference, not rebuilt
+    assert store.last_update_ts == sampled.ts and store.history.get(0).ts == sampled.ts
+    cam._load_bytes.assert_not_called()
+
+async def test_duplicate_frames(hass):
+    store = SnapStore()
+    cam = SnapCamCamera(hass, _entry(), store)
+    assert await cam._commit(b"same", "camera.door") and await cam._commit(b"same", "camera.door")
+    assert store.generation == 1 and store.duplicates == 1 and store.frames_seen == 2 and store.last is None
+    keep_store = SnapStore()
+    keep = SnapCamCamera(hass, _entry(**{CONF_DROP_DUPLICATES: False}), keep_store)
+    await keep._commit(b"same", "camera.door"); await keep._commit(b"same", "camera.door")
+    assert keep_store.generation == 2 and keep_store.duplicates == 1 and keep_store.last.data == b"same"
+
+async def test_change_gate(hass):
+    Image = pytest.importorskip("PIL.Image")
+
+    def jpeg(color, quality):
+        out = io.BytesIO()
+        Image.new("RGB", (64, 48), color).save(out, format="JPEG", quality=quality)
+        return out.getvalue()
+
+    store = SnapStore()
+    cam = SnapCamCamera(hass, _entry(**{CONF_CHANGE_THRESHOLD: 5.0}), store)
+    red, red_again, blue = jpeg((200, 30, 30), 90), jpeg((200, 30, 30), 60), jpeg((30, 30, 200), 90)
+    assert red != red_again
+    await cam._commit(red, "camera.door")
+    await cam._commit(red_again, "camera.door")  # same scene, other bytes
+    assert store.generation == 1 and store.unchanged == 1
+    await cam._commit(blue, "camera.door")
+    assert store.generation == 2 and store.current.data == blue and store.last.data == red
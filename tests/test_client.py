@@ -0,0 +1,59 @@
+from __future__ import annotations
+import struct
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.snapcam.client import FrameTooLarge, _read_body, _read_mjpeg_frame
+
+class _Content:
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+
+    async def iter_any(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def readexactly(self, n: int) -> bytes:
+        return b"".join(self.chunks)[:n]
+
+class _Resp:
+    """Just the parts of aiohttp.ClientResponse the readers use."""
+    def __init__(self, body: bytes, step: int = 1 << 20, content_length: int | None = None, headers: dict | None = None) -> None:
+        self.content = _Content([body[i:i + step] for i in range(0, len(body), step)])
+        self.content_length, self.headers = content_length, headers or {}
+
+def _jpeg(payload: bytes = b"scan", thumb: bool = False) -> bytes:
+    app = b""
+    if thumb:  # EXIF APP1 carrying a complete thumbnail JPEG incl. its own EOI
+        exif = b"Exif\x00\x00" + b"\xff\xd8\xff\xdb\x00\x03q\xff\xd9"
+        app = b"\xff\xe1" + struct.pack(">H", 2 + len(exif)) + exif
+    return b"\xff\xd8" + app + b"\xff\xdb\x00\x03q" + b"\xff\xda\x00\x03s" + payload + b"\xff\x00\xff\xd0" + b"\xff\xd9"
+
+async def test_body_uses_content_length():
+    assert await _read_body(_Resp(b"abcdef", content_length=3), 10) == b"abc"
+    with pytest.raises(FrameTooLarge):
+        await _read_body(_Resp(b"abcdef", content_length=6), 5)
+
+async def test_body_streams_encoded_and_unsized():
+    # Content-Length is the compressed size when encoded: stream the decoded bytes instead
+    assert await _read_body(_Resp(b"abcdef", 2, content_length=3, headers={"Content-Encoding": "gzip"}), 10) == b"abcdef"
+    assert await _read_body(_Resp(b"abcdef", 2), 10) == b"abcdef"
+    with pytest.raises(FrameTooLarge):
+        await _read_body(_Resp(b"x" * 20, 4), 10)
+
+@pytest.mark.parametrize("step", [1, 3, 7, 1000])
+async def test_mjpeg_first_frame_by_marker_scan(step):
+    first = _jpeg(b"one", thumb=True)
+    body = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + first + b"\r\n--frame\r\n\r\n" + _jpeg(b"two")
+    assert await _read_mjpeg_frame(_Resp(body, step), 1000) == first
+
+async def test_mjpeg_part_content_length():
+    jpg = _jpeg()
+    body = b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % len(jpg) + jpg + b"\r\n--frame\r\n"
+    assert await _read_mjpeg_frame(_Resp(body, 5), 1000) == jpg
+
+async def test_mjpeg_limits():
+    with pytest.raises(FrameTooLarge):
+        await _read_mjpeg_frame(_Resp(b"--frame\r\n\r\n" + _jpeg(b"x" * 100), 8), 50)
+    assert await _read_mjpeg_frame(_Resp(b"--frame\r\n\r\n\xff\xd8\xff\xda\x00\x02", 4), 50) is None
@@ -0,0 +1,22 @@
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.components.diagnostics import REDACTED
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.snapcam.const import *
+from custom_components.snapcam.diagnostics import _redact_url, async_get_config_entry_diagnostics
+
+def test_redact_url():
+    assert _redact_url("http://admin:pw@1.2.3.4:81/snap.cgi?usr=admin&pwd=x") == \
+        f"http://{REDACTED}@1.2.3.4:81/snap.cgi?usr={REDACTED}&pwd={REDACTED}"
+    assert _redact_url("camera.door") == "camera.door"
+
+async def test_config_is_redacted(hass):
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_CAM_NAME: "Door", CONF_PAIRS: [{KEY_PAIR_URL: "http://cam/x.jpg?token=secret"}]},
+                            options={"password": "hunter2"})
+    diag = await async_get_config_entry_diagnostics(hass, entry)
+    assert diag["config"][CONF_PAIRS][0][KEY_PAIR_URL] == REDACTED
+    assert diag["config"]["password"] == REDACTED and "secret" not in str(diag)
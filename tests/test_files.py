@@ -0,0 +1,50 @@
+from __future__ import annotations
+import asyncio, os
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.snapcam.const import DATA_WATCHER
+from custom_components.snapcam.files import FileSource, async_watch_file
+
+def test_reads_once_until_changed(tmp_path):
+    path = tmp_path / "snap.jpg"
+    path.write_bytes(b"one")
+    src = FileSource(str(path))
+    first = src.read()
+    assert first == b"one" and src.read() is first
+    assert src.reads == 1 and src.unchanged == 1
+    path.write_bytes(b"second")
+    st = os.stat(path); os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert src.read() == b"second" and src.reads == 2
+
+def test_atomic_replace_is_seen(tmp_path):
+    path, tmp = tmp_path / "snap.jpg", tmp_path / "snap.tmp"
+    path.write_bytes(b"aaa")
+    src = FileSource(str(path))
+    assert src.read() == b"aaa"
+    tmp.write_bytes(b"bbb"); os.replace(tmp, path)  # same size, new inode
+    assert src.read() == b"bbb"
+
+def test_missing_and_non_regular(tmp_path):
+    src = FileSource(str(tmp_path / "nope.jpg"))
+    assert src.read() is None and src.signature() is None
+    assert FileSource(str(tmp_path)).read() is None
+
+async def test_watch_fires_on_complete_file_and_stops(hass, tmp_path):
+    pytest.importorskip("watchdog")
+    path, fired = tmp_path / "snap.jpg", []
+    remove = async_watch_file(hass, FileSource(str(path)), lambda: fired.append(1))
+    early = async_watch_file(hass, FileSource(str(tmp_path / "other.jpg")), lambda: None)
+    early()  # removed before its background setup ran
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(path.write_bytes, b"frame")
+    for _ in range(50):
+        if fired:
+            break
+        await asyncio.sleep(0.05)
+    assert fired
+    remove()
+    await hass.async_block_till_done()
+    watcher = hass.data[DATA_WATCHER]
+    assert not watcher._dirs and watcher._observer is None
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import asyncio, io
+from unittest.mock import patch
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+Image = pytest.importorskip("PIL.Image")
+
+from custom_components.snapcam import image
+from custom_components.snapcam.image import ResizeCache, sniff_content_type
+
+def _jpeg(w: int = 640, h: int = 480) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (w, h), (200, 30, 30)).save(out, format="JPEG")
+    return out.getvalue()
+
+async def test_resize_cached_per_key(hass):
+    cache, src = ResizeCache(maxsize=2), _jpeg()
+    small = await cache.async_get(hass, ("g1", 320), src, 320, None, 80)
+    assert Image.open(io.BytesIO(small)).size == (320, 240)
+    assert await cache.async_get(hass, ("g1", 320), src, 320, None, 80) is small
+    await cache.async_get(hass, ("g1", 200), src, 200, None, 80)
+    await cache.async_get(hass, ("g1", 100), src, 100, None, 80)
+    assert ("g1", 320) not in cache._items  # LRU bound
+
+async def test_concurrent_misses_share_one_resize(hass):
+    cache, src = ResizeCache(), _jpeg()
+    with patch.object(image, "resize_image", wraps=image.resize_image) as resize:
+        results = await asyncio.gather(*(cache.async_get(hass, ("g1", 320), src, 320, None, 80) for _ in range(5)))
+    assert resize.call_count == 1 and all(r is results[0] for r in results)
+
+async def test_transcode_and_undecodable(hass):
+    cache = ResizeCache()
+    webp = await cache.async_get(hass, ("g1", "webp"), _jpeg(), None, None, 80, "image/webp")
+    assert sniff_content_type(webp) == "image/webp"
+    junk = b"not an image"
+    assert await cache.async_get(hass, ("g2", 10), junk, 10, 10, 80) is junk  # served as is
@@ -0,0 +1,91 @@
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.snapcam.limiter import FetchLimiter, TokenBucket
+
+async def test_concurrency_cap_and_fifo(hass):
+    limiter, order, peak = FetchLimiter(hass), [], 0
+    limiter.register("e", 2)
+    gate = asyncio.Event()
+
+    async def job(i: int) -> None:
+        nonlocal peak
+        async with limiter.slot(("k", i)):
+            order.append(i); peak = max(peak, limiter.active)
+            await gate.wait()
+
+    tasks = [asyncio.create_task(job(i)) for i in range(5)]
+    await asyncio.sleep(0)
+    assert limiter.active == 2 and limiter.queue_depth == 3
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3, 4] and peak == 2
+    assert limiter.active == 0 and limiter.queued == 3
+
+async def test_cancelled_waiter_frees_its_turn(hass):
+    limiter, order = FetchLimiter(hass), []
+    limiter.register("e", 1)
+    gate = asyncio.Event()
+
+    async def job(i: int) -> None:
+        async with limiter.slot(("k", i)):
+            order.append(i)
+            await gate.wait()
+
+    tasks = [asyncio.create_task(job(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks[1].cancel()
+    gate.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert order == [0, 2] and limiter.active == 0 and limiter.queue_depth == 0
+
+async def test_raising_limit_wakes_waiters(hass):
+    limiter = FetchLimiter(hass)
+    limiter.register("a", 1)
+    gate = asyncio.Event()
+
+    async def job() -> None:
+        async with limiter.slot(("k",)):
+            await gate.wait()
+
+    tasks = [asyncio.create_task(job()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.active == 1
+    limiter.register("b", 3)
+    assert limiter.active == 3 and limiter.queue_depth == 0
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert limiter.active == 0
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    now = bucket.stamp
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == pytest.approx(0.5)  # third caller waits one token
+    assert bucket.reserve(now) == pytest.approx(1.0)  # and queues behind it
+    assert bucket.reserve(now + 10.0) == 0.0  # refilled, capped at capacity
+    assert bucket.tokens == pytest.approx(1.0)
+
+async def test_lowering_limit_drains_to_new_limit(hass):
+    limiter, peak_after = FetchLimiter(hass), []
+    limiter.register("a", 1); limiter.register("b", 4)
+    gate = asyncio.Event()
+
+    async def job() -> None:
+        async with limiter.slot(("k",)):
+            await gate.wait()
+            if limiter.limit == 1:
+                peak_after.append(limiter.active)
+
+    tasks = [asyncio.create_task(job()) for _ in range(8)]
+    await asyncio.sleep(0)
+    assert limiter.active == 4
+    limiter.unregister("b")
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert max(peak_after[4:]) == 1  # queued fetches ran one at a time
+    assert limiter.active == 0 and limiter.queue_depth == 0
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.snapcam.frame import Frame
+from custom_components.snapcam.prefetch import Prefetcher
+from custom_components.snapcam.store import SnapHistory
+
+async def test_take_hands_out_fresh_frames_only(hass):
+    warm = Prefetcher(hass, AsyncMock(), 0.02, None, "test")
+    assert warm.take() is None
+    warm.put(b"one")
+    frame = warm.take()
+    assert frame.data == b"one" and warm.take() is frame and warm.hits == 2
+    await asyncio.sleep(0.06)  # older than two polling periods
+    assert warm.take() is None
+
+async def test_ring_samples_and_pick(hass):
+    ring = SnapHistory(5, 1 << 20)
+    warm = Prefetcher(hass, AsyncMock(), 1.0, None, "test", ring, source="camera.a")
+    content = b"a"
+    warm.put(content); warm.put(content)  # same bytes again: one sample
+    assert len(ring) == 1 and ring.get(0).source == "camera.a"
+    now = dt_util.now()
+    ring.clear()
+    for age, data in ((30, b"old"), (4, b"x" * 3), (2, b"y" * 9), (1, b"z")):
+        ring.append(Frame(data, "camera.a", now - timedelta(seconds=age)))
+    assert warm.pick(5, "earliest").data == b"xxx"
+    assert warm.pick(5, "best").data == b"y" * 9
+    assert warm.pick(0.5, "earliest") is None
+
+async def test_polls_only_while_armed(hass):
+    hass.states.async_set("alarm_control_panel.home", "disarmed")
+    load = AsyncMock(return_value=b"frame")
+    warm = Prefetcher(hass, load, 0.02, "alarm_control_panel.home", "test")
+    warm.start()
+    await asyncio.sleep(0.1)
+    assert load.call_count == 0
+    hass.states.async_set("alarm_control_panel.home", "armed_away")
+    await asyncio.sleep(0.1)
+    assert load.call_count >= 2 and warm.take().data == b"frame"
+    hass.states.async_set("alarm_control_panel.home", "disarmed")
+    await hass.async_block_till_done()
+    assert warm.take() is None  # paused and cleared
+    warm.stop()
+    await hass.async_block_till_done()
+
+async def test_wanted_gate_skips_sampling(hass):
+    load, watching = AsyncMock(return_value=b"frame"), False
+    warm = Prefetcher(hass, load, 0.02, None, "test", SnapHistory(5, 1 << 20), wanted=lambda: watching)
+    warm.start()
+    await asyncio.sleep(0.1)
+    assert load.call_count == 0
+    watching = True
+    await asyncio.sleep(0.1)
+    assert load.call_count >= 1 and len(warm.ring) >= 1
+    warm.stop()
+    await hass.async_block_till_done()
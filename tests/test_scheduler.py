@@ -0,0 +1,52 @@
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.snapcam.scheduler import SnapScheduler
+
+def _scheduler(hass, cooldown_s: float = 0.0, ok: bool = True):
+    calls, gate = [], asyncio.Event()
+
+    async def snapshot(pair) -> bool:
+        calls.append(pair)
+        await gate.wait()
+        return ok
+
+    return SnapScheduler(hass, snapshot, cooldown_s, "test", key=lambda p: p[0]), calls, gate
+
+async def test_same_source_triggers_coalesce(hass):
+    sched, calls, gate = _scheduler(hass)
+    sched.async_trigger("a1"); sched.async_trigger("a2")
+    gate.set(); await hass.async_block_till_done()
+    assert calls == ["a1"] and sched.coalesced == 1
+
+async def test_other_source_trigger_is_queued(hass):
+    sched, calls, gate = _scheduler(hass)
+    sched.async_trigger("a1"); sched.async_trigger("b1"); sched.async_trigger("b2")
+    await asyncio.sleep(0)
+    assert calls == ["a1"]
+    gate.set(); await hass.async_block_till_done()
+    assert calls == ["a1", "b1"] and sched.coalesced == 1 and not sched.busy
+
+async def test_cooldown_skips_and_failure_hands_slot_back(hass):
+    sched, calls, gate = _scheduler(hass, cooldown_s=60.0)
+    gate.set()
+    sched.async_trigger("a1"); await hass.async_block_till_done()
+    sched.async_trigger("a2")
+    assert calls == ["a1"] and sched.skipped == 1 and sched.cooldown_remaining() > 0
+    failing, fcalls, fgate = _scheduler(hass, cooldown_s=60.0, ok=False)
+    fgate.set()
+    failing.async_trigger("a1"); await hass.async_block_till_done()
+    failing.async_trigger("a2"); await hass.async_block_till_done()
+    assert fcalls == ["a1", "a2"] and failing.skipped == 0
+
+async def test_requests_share_same_source_and_wait_for_others(hass):
+    sched, calls, gate = _scheduler(hass, cooldown_s=60.0)
+    sched.async_trigger("a1")
+    tasks = [asyncio.create_task(sched.async_request(p)) for p in ("a2", "b1")]
+    await asyncio.sleep(0)
+    assert calls == ["a1"]
+    gate.set(); await asyncio.gather(*tasks)
+    assert calls == ["a1", "b1"] and sched.coalesced == 1  # b1 bypassed the cooldown
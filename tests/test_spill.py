@@ -0,0 +1,67 @@
+from __future__ import annotations
+from unittest.mock import patch
+import os
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.snapcam.const import SPILL_DEBOUNCE_S
+from custom_components.snapcam.frame import Frame
+from custom_components.snapcam.spill import SnapSpill
+from custom_components.snapcam.store import SnapStore
+
+def _commit(store: SnapStore, data: bytes) -> None:
+    store.last, store.current = store.current, Frame(data, "camera.door", dt_util.now())
+    store.last_update_ts, store.last_source_camera = store.current.ts, "camera.door"
+    store.generation += 1
+
+async def test_failed_write_is_retried_on_a_timer(hass):
+    spill, store = SnapSpill(hass), SnapStore()
+    _commit(store, b"one")
+    spill._dirty["e"] = store
+    with patch.object(spill, "write", side_effect=OSError("disk full")):
+        await spill.async_flush()
+    assert "e" in spill._dirty and spill._unsub_flush is not None
+    assert spill._retry_s == 2 * SPILL_DEBOUNCE_S
+    spill._unsub_flush(); spill._unsub_flush = None
+    await spill.async_flush()  # disk is back
+    assert not spill._dirty and spill._retry_s == SPILL_DEBOUNCE_S
+    assert (await hass.async_add_executor_job(spill.read, "e"))["current"] == b"one"
+
+async def test_last_reuses_span_of_previous_current(hass):
+    spill, store = SnapSpill(hass), SnapStore()
+    for data in (b"a" * 100, b"b" * 100, b"c" * 100):
+        _commit(store, data)
+        spill._dirty["e"] = store
+        await spill.async_flush()
+    rec = spill._index["e"]
+    assert rec["last"] == [100, 100] and rec["current"] == [200, 100]  # each frame appended once
+    got = await hass.async_add_executor_job(spill.read, "e")
+    assert got["current"] == b"c" * 100 and got["last"] == b"b" * 100
+
+async def test_unchanged_generation_is_not_rewritten(hass):
+    spill, store = SnapSpill(hass), SnapStore()
+    _commit(store, b"one")
+    for _ in range(2):
+        spill._dirty["e"] = store
+        await spill.async_flush()
+    assert spill._index["e"]["current"] == [0, 3]
+    await hass.async_add_executor_job(spill.read, "e")
+    assert spill._mmap.size() == 3
+
+async def test_compaction_and_restore(hass):
+    spill, store = SnapSpill(hass), SnapStore()
+    for n in range(8):  # ~2.4 MB appended, 600 kB live
+        _commit(store, bytes([n]) * 300_000)
+        spill._dirty["e"] = store
+        await spill.async_flush()
+    size = await hass.async_add_executor_job(os.path.getsize, spill._path("frames.seg"))
+    assert size < 8 * 300_000
+    fresh, restored = SnapSpill(hass), SnapStore()
+    assert await fresh.async_restore("e", restored)
+    assert restored.current.data == bytes([7]) * 300_000 and restored.last.data == bytes([6]) * 300_000
+    assert restored.current.source == "camera.door" and restored.generation == 1
+    await fresh.async_forget("e")
+    assert await hass.async_add_executor_job(fresh.read, "e") is None
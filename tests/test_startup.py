@@ -0,0 +1,70 @@
+from __future__ import annotations
+import asyncio
+from unittest.mock import patch
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState
+
+from custom_components.snapcam import startup
+from custom_components.snapcam.startup import StartupScheduler
+
+@pytest.fixture(autouse=True)
+def no_jitter():
+    with patch.object(startup, "STARTUP_JITTER_S", 0):
+        yield
+
+def _job(order: list, name: str, gate: asyncio.Event | None = None, running: list | None = None):
+    async def job() -> None:
+        order.append(name)
+        if running is not None:
+            running.append(name)
+        if gate is not None:
+            await gate.wait()
+        if running is not None:
+            running.remove(name)
+    return job
+
+async def test_waits_for_started_and_promotes(hass):
+    hass.set_state(CoreState.starting)
+    sched, order = StartupScheduler(hass), []
+    with patch.object(startup, "STARTUP_CONCURRENCY", 1):
+        for name in ("e1", "e2", "e3", "e4"):
+            sched.async_enqueue(name, _job(order, name))
+        sched.async_promote("e3")
+        await hass.async_block_till_done()
+        assert order == []
+        hass.set_state(CoreState.running)
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+        await hass.async_block_till_done()
+    assert order == ["e3", "e1", "e2", "e4"]
+
+async def test_concurrency_cap_and_failures(hass):
+    sched, order, running, gate = StartupScheduler(hass), [], [], asyncio.Event()
+    peak = 0
+
+    async def failing() -> None:
+        raise RuntimeError("camera offline")
+
+    sched.async_enqueue("bad", failing)
+    for n in range(6):
+        sched.async_enqueue(f"e{n}", _job(order, f"e{n}", gate, running))
+    for _ in range(5):
+        await asyncio.sleep(0)
+        peak = max(peak, len(running))
+    assert peak <= startup.STARTUP_CONCURRENCY
+    gate.set()
+    await hass.async_block_till_done()
+    assert sorted(order) == [f"e{n}" for n in range(6)]
+
+async def test_cancelled_entry_never_runs(hass):
+    hass.set_state(CoreState.starting)
+    sched, order = StartupScheduler(hass), []
+    sched.async_enqueue("e1", _job(order, "e1")); sched.async_enqueue("e2", _job(order, "e2"))
+    sched.async_cancel("e1")
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    assert order == ["e2"]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from datetime import timedelta
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.snapcam.frame import Frame
+from custom_components.snapcam.store import HistoryBudget, SnapHistory, SnapStore
+
+T0 = dt_util.utcnow()
+
+def _frame(n: int, size: int = 10) -> Frame:
+    return Frame(bytes([n]) * size, f"cam{n}", T0 + timedelta(seconds=n))
+
+def test_depth_and_order():
+    ring = SnapHistory(depth=3, max_bytes=1000)
+    for n in range(5):
+        ring.append(_frame(n))
+    assert len(ring) == 3 and ring.nbytes == 30
+    assert [ring.get(k).source for k in range(3)] == ["cam4", "cam3", "cam2"]
+    assert ring.get(3) is None
+
+def test_byte_cap_and_oversized_frame():
+    ring = SnapHistory(depth=10, max_bytes=25)
+    for n in range(3):
+        ring.append(_frame(n))
+    assert len(ring) == 2 and ring.nbytes == 20
+    ring.append(_frame(9, size=26))  # larger than the whole ring: ignored
+    assert ring.get(0).source == "cam2"
+
+def test_global_budget_drops_oldest_across_rings():
+    budget = HistoryBudget(max_bytes=40)
+    a, b = SnapHistory(10, 1000, budget), SnapHistory(10, 1000, budget)
+    a.append(_frame(0)); b.append(_frame(1)); a.append(_frame(2)); b.append(_frame(3))
+    b.append(_frame(4))
+    assert budget.used == 40
+    assert [f.source for f in a.slots] == ["cam2"]  # cam0 was the oldest anywhere
+    a.release()
+    assert a not in budget.rings and len(a) == 0 and budget.used == 30
+
+def test_frames_shared_by_reference():
+    ring, store = SnapHistory(3, 1000), SnapStore()
+    frame = _frame(1)
+    store.current = frame; ring.append(frame)
+    assert ring.get(0) is store.current
+    with pytest.raises(AttributeError):
+        frame.data = b""
+
+def test_listener_errors_are_isolated():
+    store, calls = SnapStore(), []
+    store.async_add_listener(lambda: 1 / 0)
+    remove = store.async_add_listener(lambda: calls.append(1))
+    store.async_notify()
+    remove(); store.async_notify()
+    assert calls == [1]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.snapcam.timers import TimerWheel
+
+TICK = 0.02
+
+async def _drain(wheel: TimerWheel) -> None:
+    while wheel._handle is not None:  # let the wheel stop so no loop timer lingers
+        await asyncio.sleep(TICK)
+
+async def test_fires_after_delay(hass):
+    wheel, fired = TimerWheel(hass, TICK, 8), {}
+    t0 = hass.loop.time()
+    wheel.schedule("a", 0.05, lambda: fired.setdefault("a", hass.loop.time()))
+    await asyncio.sleep(0.15)
+    assert fired["a"] - t0 >= 0.05
+    assert len(wheel) == 0
+    await _drain(wheel)
+
+async def test_not_early_while_running(hass):
+    wheel, fired = TimerWheel(hass, TICK, 8), {}
+    wheel.schedule("keep", 0.1, lambda: None)  # wheel running
+    await asyncio.sleep(TICK * 1.5)  # mid-tick
+    t0 = hass.loop.time()
+    wheel.schedule("b", TICK, lambda: fired.setdefault("b", hass.loop.time()))
+    await asyncio.sleep(0.1)
+    assert fired["b"] - t0 >= TICK
+    await _drain(wheel)
+
+async def test_rounds_beyond_wheel_size(hass):
+    wheel, fired = TimerWheel(hass, TICK, 4), []
+    t0 = hass.loop.time()
+    wheel.schedule("long", 0.15, lambda: fired.append(hass.loop.time()))  # > size * tick
+    await asyncio.sleep(0.1)
+    assert not fired and wheel.pending("long")
+    await asyncio.sleep(0.15)
+    assert len(fired) == 1 and fired[0] - t0 >= 0.15
+    await _drain(wheel)
+
+async def test_cancel_and_reschedule(hass):
+    wheel, fired = TimerWheel(hass, TICK, 8), []
+    wheel.schedule("x", 0.04, lambda: fired.append(1))
+    assert wheel.cancel("x") and not wheel.cancel("x")
+    wheel.schedule("y", 0.04, lambda: fired.append(2))
+    wheel.schedule("y", 0.08, lambda: fired.append(3))  # replaces the first
+    await asyncio.sleep(0.15)
+    assert fired == [3]
+    await _drain(wheel)
+
+async def test_failing_action_does_not_stall(hass):
+    wheel, fired = TimerWheel(hass, TICK, 8), []
+    wheel.schedule("bad", TICK, lambda: 1 / 0)
+    wheel.schedule("good", TICK, lambda: fired.append(1))
+    await asyncio.sleep(0.1)
+    assert fired == [1]
+    await _drain(wheel)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import State
+
+from custom_components.snapcam.camera import Pair
+from custom_components.snapcam.triggers import StateCondition
+
+def _cond(hass, **kw) -> StateCondition:
+    return StateCondition(hass, Pair(source_kind="entity", state_entity="sensor.x", **kw), "test")
+
+async def test_value_lists(hass):
+    cond = _cond(hass, state_to="On, open", state_from="off")
+    assert cond.matches("off", "on") and cond.matches("off", "open")
+    assert not cond.matches("unknown", "on")  # from filter
+    assert not cond.matches("off", "closed")
+
+async def test_attribute_value(hass):
+    cond = _cond(hass, attribute="mode", state_to="away")
+    assert cond.value(State("sensor.x", "1", {"mode": "Away"})) == "away"
+    assert cond.value(State("sensor.x", "1")) is None
+    assert cond.value(None) is None
+
+async def test_threshold_fires_on_crossing_only(hass):
+    cond = _cond(hass, state_to="on", above=20.0, below=30.0)
+    assert cond.to is None  # `to` ignored with thresholds
+    assert cond.matches("19", "21")
+    assert not cond.matches("21", "25")  # already inside
+    assert not cond.matches("25", "31")
+    assert not cond.matches("19", "unavailable")
+
+async def test_hold_restarts_only_when_entering(hass):
+    cond = _cond(hass, state_to="on,open")
+    assert cond.enters("off")
+    assert not cond.enters("on")  # on -> open stays within the target
+    assert _cond(hass, state_to=None).enters("anything")  # no target: every change counts
+
+async def test_template(hass):
+    assert _cond(hass, state_to="on", condition="{{ true }}").matches("off", "on")
+    assert not _cond(hass, state_to="on", condition="{{ not").matches("off", "on")  # invalid never matches